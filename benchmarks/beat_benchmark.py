@@ -0,0 +1,218 @@
+"""Accuracy and throughput benchmark for BeatDetector on synthetic audio.
+
+Every case is a click track with known beat positions, so each analyzer
+configuration can be scored against ground truth per difficulty filter
+alongside wall time, peak memory and real-time factor.
+
+    python -m benchmarks.beat_benchmark --quick
+    python -m benchmarks.beat_benchmark --output after.json --compare before.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import librosa
+from src.core.beat_detector import BeatDetector, DIFFICULTY_INTERVALS, DEFAULT_INTERVAL, filter_beats, warm_up
+
+TOLERANCE = 0.07  # seconds, the usual beat-tracking evaluation window
+
+# Every difficulty the menu offers; God and Beyond thin beats like Normal (DEFAULT_INTERVAL)
+DIFFICULTIES = ["Easy", "Normal", "Hard", "Insane", "Impossible", "God", "Beyond"]
+
+CONFIGS = {
+    "default": {"sr": 22050, "hop_length": 512},
+    "hop256": {"sr": 22050, "hop_length": 256},
+    "sr11k": {"sr": 11025, "hop_length": 256},
+}
+
+# name -> (duration s, tempo curve start bpm, end bpm, step instead of ramp, noise rms, long)
+CASES = {
+    "click_90": (30, 90, 90, False, 0.0, False),
+    "click_120": (30, 120, 120, False, 0.0, False),
+    "click_174": (30, 174, 174, False, 0.0, False),
+    "ramp_100_140": (45, 100, 140, False, 0.0, False),
+    "change_100_150": (45, 100, 150, True, 0.0, False),
+    "noisy_120": (30, 120, 120, False, 0.3, False),
+    "long_128": (600, 128, 128, False, 0.02, True),
+}
+
+def beat_grid(duration, start_bpm, end_bpm, step):
+    beats = []
+    t = 0.5
+    while t < duration - 0.5:
+        beats.append(t)
+        progress = t / duration
+        if step:
+            bpm = start_bpm if progress < 0.5 else end_bpm
+        else:
+            bpm = start_bpm + (end_bpm - start_bpm) * progress
+        t += 60.0 / bpm
+    return beats
+
+def synthesize(beats, duration, sr, noise, seed=0):
+    """Kick + click on every beat over a quiet pad, with optional white noise."""
+    rng = np.random.default_rng(seed)
+    n = int(duration * sr)
+    t = np.arange(n, dtype=np.float32) / sr
+    y = 0.05 * np.sin(2 * np.pi * 220 * t, dtype=np.float32)
+    ct = t[:int(0.08 * sr)]
+    hit = np.sin(2 * np.pi * 60 * ct) * np.exp(-ct * 40) + 0.5 * np.sin(2 * np.pi * 1500 * ct) * np.exp(-ct * 120)
+    for b in beats:
+        i = int(b * sr)
+        end = min(n, i + len(hit))
+        y[i:end] += hit[:end - i]
+    if noise:
+        y += rng.standard_normal(n).astype(np.float32) * noise
+    return y.astype(np.float32)
+
+def match(estimated, reference, tolerance=TOLERANCE):
+    """One-to-one (estimated, reference) pairs within the tolerance, in time order."""
+    pairs = []
+    i = j = 0
+    while i < len(estimated) and j < len(reference):
+        d = estimated[i] - reference[j]
+        if abs(d) <= tolerance:
+            pairs.append((estimated[i], reference[j]))
+            i += 1
+            j += 1
+        elif estimated[i] < reference[j]:
+            i += 1
+        else:
+            j += 1
+    return pairs
+
+def score(estimated, reference, tolerance=TOLERANCE):
+    """Offsets are estimated minus reference."""
+    offsets = [e - r for e, r in match(estimated, reference, tolerance)]
+    precision = len(offsets) / len(estimated) if estimated else 0.0
+    recall = len(offsets) / len(reference) if reference else 0.0
+    return _scores(estimated, reference, offsets, precision, recall)
+
+def score_filtered(estimated, reference, interval, tolerance=TOLERANCE):
+    """Scores the notes a difficulty keeps against the full reference grid.
+
+    Thinning both lists on their own would put them out of phase, so recall
+    thins the matched beats instead and compares that with how many notes a
+    perfect detector would keep at this interval.
+    """
+    kept = filter_beats(estimated, interval)
+    offsets = [e - r for e, r in match(kept, reference, tolerance)]
+    precision = len(offsets) / len(kept) if kept else 0.0
+    expected = len(filter_beats(reference, interval))
+    covered = len(filter_beats([e for e, _ in match(estimated, reference, tolerance)], interval))
+    recall = min(1.0, covered / expected) if expected else 0.0
+    return _scores(kept, reference, offsets, precision, recall)
+
+def _scores(estimated, reference, offsets, precision, recall):
+    f_measure = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {
+        "f_measure": round(f_measure, 4),
+        "precision": round(precision, 4),
+        "recall": round(recall, 4),
+        "estimated": len(estimated),
+        "reference": len(reference),
+        "mean_offset_ms": round(float(np.mean(offsets)) * 1000, 2) if offsets else None,
+        "mean_abs_offset_ms": round(float(np.mean(np.abs(offsets))) * 1000, 2) if offsets else None,
+    }
+
+def run_case(case_name, config_name, measure_memory=True):
+    duration, start_bpm, end_bpm, step, noise, _ = CASES[case_name]
+    config = CONFIGS[config_name]
+    reference = beat_grid(duration, start_bpm, end_bpm, step)
+    y = synthesize(reference, duration, config["sr"], noise)
+
+    # detect() never touches the cache, but the constructor creates its directory
+    with tempfile.TemporaryDirectory() as cache_dir:
+        detector = BeatDetector(song_path="", cache_dir=cache_dir)
+        t0 = time.perf_counter()
+        detector.detect(y, config["sr"], hop_length=config["hop_length"])
+        wall = time.perf_counter() - t0
+
+        peak_mb = None
+        if measure_memory:
+            tracemalloc.start()
+            BeatDetector(song_path="", cache_dir=cache_dir).detect(y, config["sr"], hop_length=config["hop_length"])
+            peak_mb = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 2)
+            tracemalloc.stop()
+
+    estimated = detector.raw_beat_times
+    accuracy = {"raw": score(estimated, reference)}
+    for difficulty in DIFFICULTIES:
+        accuracy[difficulty] = score_filtered(estimated, reference, DIFFICULTY_INTERVALS.get(difficulty, DEFAULT_INTERVAL))
+    return {
+        "case": case_name,
+        "config": config_name,
+        "duration_s": duration,
+        "tempo_true": [start_bpm, end_bpm],
+        "tempo_estimated": round(detector.tempo, 2),
+        "wall_s": round(wall, 4),
+        "realtime_factor": round(wall / duration, 5),
+        "peak_mem_mb": peak_mb,
+        "accuracy": accuracy,
+    }
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {(r["case"], r["config"]): r for r in json.load(f)["results"]}
+    print(f"\nCompared with {baseline_path}:")
+    for r in results:
+        old = baseline.get((r["case"], r["config"]))
+        if not old:
+            continue
+        d_wall = (r["wall_s"] - old["wall_s"]) / old["wall_s"] * 100 if old["wall_s"] else 0.0
+        d_f = r["accuracy"]["raw"]["f_measure"] - old["accuracy"]["raw"]["f_measure"]
+        print(f"  {r['case']:<16} {r['config']:<8} wall {d_wall:+6.1f}%   raw F {d_f:+.4f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default="beat_benchmark.json")
+    parser.add_argument("--compare", help="earlier report to diff against")
+    parser.add_argument("--quick", action="store_true", help="skip the long cases")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--cases", nargs="*", default=None)
+    parser.add_argument("--configs", nargs="*", default=None)
+    args = parser.parse_args(argv)
+
+    cases = args.cases or [name for name, spec in CASES.items() if not (args.quick and spec[-1])]
+    configs = args.configs or list(CONFIGS)
+
+    warm_up()
+    results = []
+    for case_name in cases:
+        for config_name in configs:
+            r = run_case(case_name, config_name, not args.no_memory)
+            results.append(r)
+            acc = r["accuracy"]
+            per_diff = " ".join(f"{d[:4]}:{acc[d]['f_measure']:.2f}" for d in DIFFICULTIES)
+            mem = f"{r['peak_mem_mb']:7.1f} MB" if r["peak_mem_mb"] is not None else "      - MB"
+            print(f"{case_name:<16} {config_name:<8} {r['wall_s']:7.3f} s  RTF {r['realtime_factor']:.4f}  {mem}  "
+                  f"raw F {acc['raw']['f_measure']:.3f} off {acc['raw']['mean_offset_ms']} ms | {per_diff}")
+
+    report = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "librosa": librosa.__version__,
+            "numpy": np.__version__,
+            "tolerance_s": TOLERANCE,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    main()
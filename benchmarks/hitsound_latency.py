@@ -0,0 +1,117 @@
+"""Keydown-to-hitsound latency benchmark for HitSounds and GameEngine.handle_keydown.
+
+Times the software path from a key press to Channel.play (with and without
+hitsounds, and with every voice busy so stealing kicks in), counts bytes
+and allocated on that path. Nothing here measures when the sound is
+actually audible; that needs a loopback recording. audible_estimate_ms is
+only arithmetic: the keydown path plus one to two mixer buffers, one waiting
+for the next mixer callback and one playing out, before any driver or device
+latency.
+
+    python -m benchmarks.hitsound_latency
+    SDL_AUDIODRIVER=dummy python -m benchmarks.hitsound_latency --presses 5000
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+from src.core.constants import AUDIO_BUFFER
+from src.core.hitsounds import HitSounds, SOUND_HIT, SOUND_MISS
+from src.gameplay.engine import GameEngine
+from src.gameplay.layout import Layout
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+def summarize(samples_us):
+    return {
+        "mean_us": round(statistics.mean(samples_us), 2),
+        "p50_us": round(percentile(samples_us, 0.5), 2),
+        "p99_us": round(percentile(samples_us, 0.99), 2),
+        "max_us": round(max(samples_us), 2),
+    }
+
+def time_calls(fn, count, setup=None):
+    samples = []
+    for i in range(count):
+        if setup: setup(i)
+        t0 = time.perf_counter()
+        fn(i)
+        samples.append((time.perf_counter() - t0) * 1e6)
+    return summarize(samples)
+
+def allocated_bytes(fn, count):
+    fn(0)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for i in range(count):
+        fn(i)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    return sum(stat.size_diff for stat in after.compare_to(before, "filename") if stat.size_diff > 0)
+
+def keydown_on_note(hitsounds, count):
+    """handle_keydown right on a note's time, with the chart rewound (untimed) before every press."""
+    layout = Layout()
+    engine = GameEngine(pygame.Surface((layout.width, layout.height)), "", "Normal", {"chord_chance": 0, "hold_chance": 0}, 600, layout)
+    engine.hitsounds = hitsounds
+    engine.set_beats([0.25 * i for i in range(1, 2000)])
+    notes = engine.notes
+
+    def setup(i):
+        index = i % len(notes)
+        engine.seek(notes.times[index] - 2.0)
+        engine.update(notes.times[index], 0.0)
+
+    def press(i):
+        index = i % len(notes)
+        engine.handle_keydown(notes.lanes[index], notes.times[index])
+    return time_calls(press, count, setup)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--presses", type=int, default=2000)
+    parser.add_argument("--output", default="hitsound_latency.json")
+    args = parser.parse_args(argv)
+
+    pygame.mixer.pre_init(buffer=AUDIO_BUFFER)
+    pygame.init()
+    t0 = time.perf_counter()
+    hitsounds = HitSounds()
+    load_ms = (time.perf_counter() - t0) * 1000
+    freq, size, channels = pygame.mixer.get_init()
+
+    def play(i):
+        hitsounds.play(i & 3, SOUND_HIT)
+
+    report = {
+        "mixer": {"freq": freq, "size": size, "channels": channels, "buffer": AUDIO_BUFFER,
+                  "buffer_ms": round(AUDIO_BUFFER / freq * 1000, 2), "driver": os.environ.get("SDL_AUDIODRIVER", "default")},
+        "load_ms": round(load_ms, 2),
+        "play_idle_voice": time_calls(play, args.presses, lambda i: hitsounds.stop()),
+        "play_all_voices_busy": time_calls(play, args.presses),
+        "play_miss": time_calls(lambda i: hitsounds.play(i & 3, SOUND_MISS), args.presses),
+        "alloc_bytes": {"play": allocated_bytes(play, args.presses), "empty_loop": allocated_bytes(lambda i: None, args.presses)},
+        "keydown_without_sounds": keydown_on_note(None, args.presses),
+        "keydown_with_sounds": keydown_on_note(hitsounds, args.presses),
+    }
+    keydown_ms = report["keydown_with_sounds"]["p50_us"] / 1000
+    buffer_ms = report["mixer"]["buffer_ms"]
+    report["audible_estimate_ms"] = [round(keydown_ms + buffer_ms, 2), round(keydown_ms + 2 * buffer_ms, 2)]
+    for key, value in report.items():
+        print(f"{key:<24} {value}")
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.output}")
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
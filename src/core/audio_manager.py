@@ -1,5 +1,4 @@
 import pygame
-import os
 from mutagen.mp3 import MP3
 
 class AudioManager:
@@ -8,23 +7,31 @@ class AudioManager:
         self.current_song_path = None
         self.song_duration = 0
         self.is_playing = False
+        self.start_offset = 0.0
 
-    def load_song(self, song_path):
+    def load_song(self, song_path, duration=None):
+        """duration is the library's indexed length; the file is only parsed for it when that is missing."""
         try:
             pygame.mixer.music.load(song_path)
             self.current_song_path = song_path
-            audio = MP3(song_path)
-            self.song_duration = audio.info.length
+            self.song_duration = duration or MP3(song_path).info.length
             return True
         except Exception as e:
             print(f"Error loading song: {e}")
             return False
 
-    def play(self):
+    def play(self, start=0.0):
         if self.current_song_path:
-            pygame.mixer.music.play()
+            pygame.mixer.music.play(start=start)
+            self.start_offset = start
             self.is_playing = True
 
+    def seek(self, position):
+        """Restarts playback at position (seconds) without reloading the song."""
+        position = max(0.0, min(position, self.song_duration))
+        self.play(start=position)
+        return position
+
     def stop(self):
         pygame.mixer.music.stop()
         self.is_playing = False
@@ -32,14 +39,5 @@ class AudioManager:
     def get_pos(self):
         """Returns current playback position in seconds."""
         if self.is_playing:
-            return pygame.mixer.music.get_pos() / 1000.0
+            return self.start_offset + pygame.mixer.music.get_pos() / 1000.0
         return 0
-
-    def list_songs(self, directory):
-        songs = []
-        if not os.path.exists(directory):
-            os.makedirs(directory)
-        for file in os.listdir(directory):
-            if file.endswith(".mp3"):
-                songs.append(file)
-        return songs
@@ -5,61 +5,84 @@ import os
 import json
 import hashlib
 
+from src.core.library import SongLibrary
+
+# Minimum spacing between kept beats, per difficulty
+DIFFICULTY_INTERVALS = {"Easy": 0.8, "Normal": 0.5, "Hard": 0.35, "Insane": 0.25, "Impossible": 0.15}
+DEFAULT_INTERVAL = 0.5  # anything else, God and Beyond included; those only change speed and chords
+
+# Mel band edges (of 128) for the low / mid / high onset envelopes: ~0-260 Hz, ~260 Hz-2 kHz, ~2 kHz up
+BAND_CHANNELS = [0, 10, 64, 128]
+
+def filter_beat_indices(beat_times, min_interval):
+    kept = []
+    last_time = -1.0
+    for i, t in enumerate(beat_times):
+        if t - last_time >= min_interval:
+            kept.append(i)
+            last_time = t
+    return kept
+
+def filter_beats(beat_times, min_interval):
+    return [beat_times[i] for i in filter_beat_indices(beat_times, min_interval)]
+
 class BeatDetector:
-    def __init__(self, song_path, cache_dir="assets/cache"):
+    def __init__(self, song_path, cache_dir="assets/cache", fingerprint=None):
         self.song_path = song_path
         self.cache_dir = cache_dir
+        self.fingerprint = fingerprint
         self.beat_times = []
+        self.raw_beat_times = []
+        self.beat_bands = None
+        self.tempo = None
+        self.beat_count = None
         
         if not os.path.exists(self.cache_dir):
             os.makedirs(self.cache_dir)
 
     def _get_cache_path(self, difficulty):
-        # Unique key based on filename and difficulty
-        file_hash = hashlib.md5(os.path.basename(self.song_path).encode()).hexdigest()
+        # Keyed on the file's content, so a song replaced under the same name is analyzed again
+        file_hash = self.fingerprint
+        if file_hash is None:
+            try:
+                file_hash = SongLibrary.fingerprint(self.song_path, os.path.getsize(self.song_path))
+            except OSError:
+                file_hash = hashlib.md5(os.path.basename(self.song_path).encode()).hexdigest()
         return os.path.join(self.cache_dir, f"{file_hash}_{difficulty}.json")
 
-    def analyze(self, difficulty="Normal", progress_callback=None):
-        """Analyzes the song to find beat timestamps with caching."""
+    def analyze(self, difficulty="Normal", progress_callback=None, on_decoded=None):
+        """Analyzes the song to find beat timestamps with caching.
+
+        on_decoded(y, sr) gets the decoded signal when there was no cache hit, so
+        other consumers (the dashboard thumbnail) can skip their own decode.
+        """
         cache_path = self._get_cache_path(difficulty)
         
         # Check cache
         if os.path.exists(cache_path):
             if progress_callback: progress_callback(50, "Loading from cache...")
             with open(cache_path, 'r') as f:
-                self.beat_times = json.load(f)
+                data = json.load(f)
+            # Older caches hold just the list of beat times
+            if isinstance(data, list):
+                self.beat_times = data
+            else:
+                self.beat_times = data["beats"]
+                self.beat_bands = data.get("bands")
+                self.tempo = data.get("tempo")
             if progress_callback: progress_callback(100, "Ready!")
             return self.beat_times
 
         try:
             if progress_callback: progress_callback(10, "Loading audio file...")
-            
-            # Difficulty mapping
-            diff_settings = {"Easy": 0.8, "Normal": 0.5, "Hard": 0.35, "Insane": 0.25, "Impossible": 0.15}
-            min_interval = diff_settings.get(difficulty, 0.5)
-
             y, sr = librosa.load(self.song_path)
-            if progress_callback: progress_callback(40, "Analyzing rhythmic peaks...")
-            
-            onset_env = librosa.onset.onset_strength(y=y, sr=sr)
-            if progress_callback: progress_callback(70, "Tracking beats...")
-            
-            tempo, beats = librosa.beat.beat_track(onset_envelope=onset_env, sr=sr)
-            self.beat_times = librosa.frames_to_time(beats, sr=sr).tolist()
-            
-            filtered_beats = []
-            last_time = -1.0
-            for t in self.beat_times:
-                if t - last_time >= min_interval:
-                    filtered_beats.append(t)
-                    last_time = t
-            
-            self.beat_times = filtered_beats
+            if on_decoded: on_decoded(y, sr)
+            self.detect(y, sr, difficulty, progress_callback)
             
             # Save to cache
             if progress_callback: progress_callback(90, "Saving to cache...")
             with open(cache_path, 'w') as f:
-                json.dump(self.beat_times, f)
+                json.dump({"beats": self.beat_times, "bands": self.beat_bands, "tempo": self.tempo}, f)
             
             if progress_callback: progress_callback(100, "Ready!")
             return self.beat_times
@@ -67,3 +90,43 @@ class BeatDetector:
         except Exception as e:
             print(f"Error during beat analysis: {e}")
             return [i * 0.5 for i in range(1, 100)]
+
+    def detect(self, y, sr, difficulty="Normal", progress_callback=None, hop_length=512):
+        """Beat times for an already decoded signal, thinned out for the difficulty. No caching."""
+        if progress_callback: progress_callback(40, "Analyzing rhythmic peaks...")
+        # One STFT feeds both the full-range and the per-band onset envelopes
+        S = np.abs(librosa.stft(y, hop_length=hop_length)) ** 2
+        log_mel = librosa.power_to_db(librosa.feature.melspectrogram(S=S, sr=sr))
+        onset_env = librosa.onset.onset_strength(S=log_mel, sr=sr, hop_length=hop_length)
+        band_env = librosa.onset.onset_strength_multi(S=log_mel, sr=sr, hop_length=hop_length, channels=BAND_CHANNELS)
+        if progress_callback: progress_callback(70, "Tracking beats...")
+        
+        tempo, beats = librosa.beat.beat_track(onset_envelope=onset_env, sr=sr, hop_length=hop_length)
+        self.tempo = float(np.atleast_1d(tempo)[0])
+        self.beat_count = len(beats)
+        self.raw_beat_times = librosa.frames_to_time(beats, sr=sr, hop_length=hop_length).tolist()
+        kept = filter_beat_indices(self.raw_beat_times, DIFFICULTY_INTERVALS.get(difficulty, DEFAULT_INTERVAL))
+        self.beat_times = [self.raw_beat_times[i] for i in kept]
+        self.beat_bands = beat_band_strengths(band_env, beats[kept]).tolist() if kept else []
+        return self.beat_times
+
+def beat_band_strengths(band_env, beat_frames, reach=2):
+    """Per-beat strength of each band in [0, 1], shape (beats, bands).
+
+    Takes the envelope peak within +/- reach frames of each beat and scales every
+    band by its own 95th percentile, so a quiet band can still stand out.
+    """
+    peak = band_env.copy()
+    for shift in range(1, reach + 1):
+        np.maximum(peak[:, shift:], band_env[:, :-shift], out=peak[:, shift:])
+        np.maximum(peak[:, :-shift], band_env[:, shift:], out=peak[:, :-shift])
+    scale = np.percentile(band_env, 95, axis=1, keepdims=True)
+    scale[scale <= 0] = 1.0
+    return np.round(np.clip(peak[:, beat_frames] / scale, 0.0, 1.0).T, 3)
+
+def warm_up():
+    """Pays librosa's lazy imports and numba compilation on a short synthetic signal."""
+    sr = 22050
+    y = np.random.default_rng(0).standard_normal(sr * 2).astype(np.float32) * 0.1
+    onset_env = librosa.onset.onset_strength(y=y, sr=sr)
+    librosa.beat.beat_track(onset_envelope=onset_env, sr=sr)
@@ -1,6 +1,7 @@
+import os
 import pygame
 
-# Screen Settings
+# Screen Settings: design size of the internal render surface (see gameplay/layout.py)
 SCREEN_WIDTH = 400
 SCREEN_HEIGHT = 800
 FPS = 60
@@ -20,4 +21,19 @@ LANE_NAMES = ['D', 'F', 'J', 'K']
 
 # Game settings
 TILE_SPEED = 500  # pixels per second
-LANE_WIDTH = SCREEN_WIDTH // 4
+SEEK_STEP = 5.0  # seconds skipped by the arrow keys
+
+# Judgements, best first: the largest |press - note| in seconds for each grade, and its score
+JUDGE_NAMES = ["PERFECT", "GREAT", "GOOD"]
+JUDGE_WINDOWS = [0.045, 0.090, 0.135]
+JUDGE_SCORES = [10, 7, 4]
+JUDGE_COLORS = [(0, 229, 255), (100, 255, 100), (255, 215, 0)]
+HOLD_RELEASE_GRACE = 0.1  # a hold let go this close to its end still counts
+JUDGEMENT_SHOW_TIME = 0.4  # seconds the last grade stays above the hit line
+
+# Audio settings
+# Mixer buffer in samples, shared by the song, the preview and the hitsounds. Smaller means less delay
+# before a hitsound starts but more risk of MP3 underruns on slow machines; 512 is pygame's own default.
+AUDIO_BUFFER = int(os.environ.get("TILES_AUDIO_BUFFER") or 512)
+HITSOUND_VOICES = 8  # mixer channels reserved for hitsounds
+HITSOUND_VOLUME = 0.5
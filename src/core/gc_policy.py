@@ -0,0 +1,48 @@
+import gc
+import os
+
+
+class GCPolicy:
+    """Controls the garbage collector while a song is playing.
+
+    Modes:
+      default - leave the collector alone
+      freeze  - collect once, move survivors to the permanent generation and
+                stop full (gen-2) collections until the song ends
+      disable - turn automatic collection off for the whole song
+    """
+    MODES = ("default", "freeze", "disable")
+
+    def __init__(self, mode="default"):
+        if mode not in self.MODES:
+            print(f"Unknown GC policy '{mode}', using default")
+            mode = "default"
+        self.mode = mode
+        self.active = False
+        self._saved_threshold = None
+
+    @classmethod
+    def from_env(cls):
+        return cls(os.environ.get("TILES_GC_POLICY", "default"))
+
+    def enter_song(self):
+        if self.active or self.mode == "default": return
+        self.active = True
+        gc.collect()
+        if self.mode == "freeze":
+            gc.freeze()
+            self._saved_threshold = gc.get_threshold()
+            t0, t1, _ = self._saved_threshold
+            gc.set_threshold(t0, t1, 1_000_000)
+        elif self.mode == "disable":
+            gc.disable()
+
+    def leave_song(self):
+        if not self.active: return
+        self.active = False
+        if self.mode == "freeze":
+            gc.set_threshold(*self._saved_threshold)
+            gc.unfreeze()
+        elif self.mode == "disable":
+            gc.enable()
+        gc.collect()
@@ -0,0 +1,104 @@
+import os
+import math
+from array import array
+
+import pygame
+
+from src.core.constants import AUDIO_BUFFER, HITSOUND_VOICES, HITSOUND_VOLUME
+
+SOUND_HIT = 0
+SOUND_HOLD = 1
+SOUND_MISS = 2
+SOUND_NAMES = ["hit", "hold", "miss"]
+
+# Fallback tones when assets/sounds has no sample: (Hz per lane, length s, decay per s)
+SYNTH_TONES = {
+    "hit": ((660, 784, 880, 988), 0.05, 90),
+    "hold": ((440, 523, 587, 659), 0.09, 45),
+    "miss": ((110, 110, 110, 110), 0.08, 50),
+}
+
+class HitSounds:
+    """Key hit sounds on a reserved pool of mixer channels.
+
+    Every sample is decoded into a pygame.mixer.Sound up front, one per
+    (judgement, lane), so play() only picks a channel and starts it: no file
+    I/O and no allocation while the song runs. Voices are handed out
+    round-robin; when all are busy the one at the cursor is stolen, which is
+    usually but not always the one started longest ago.
+    """
+
+    def __init__(self, sample_dir="assets/sounds", voices=HITSOUND_VOICES, volume=HITSOUND_VOLUME, enabled=True):
+        self.enabled = enabled and pygame.mixer.get_init() is not None
+        self.sounds = None
+        self.channels = []
+        self.cursor = 0
+        if not self.enabled:
+            return
+        # Reserved channels are skipped by Sound.play and find_channel, so nothing else cuts a hitsound short
+        pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), voices + 8))
+        pygame.mixer.set_reserved(voices)
+        self.channels = [pygame.mixer.Channel(i) for i in range(voices)]
+        self.sounds = tuple(tuple(self._load(sample_dir, name, lane, volume) for lane in range(4)) for name in SOUND_NAMES)
+        freq, _, _ = pygame.mixer.get_init()
+        print(f"Hitsounds ready: {voices} voices, mixer buffer ~{AUDIO_BUFFER / freq * 1000:.1f} ms")
+
+    @classmethod
+    def from_env(cls):
+        return cls(enabled=os.environ.get("TILES_HITSOUNDS", "1") != "0")
+
+    def _load(self, sample_dir, name, lane, volume):
+        for file_name in (f"{name}_{lane}.wav", f"{name}.wav", f"{name}.ogg"):
+            path = os.path.join(sample_dir, file_name)
+            if os.path.exists(path):
+                try:
+                    sound = pygame.mixer.Sound(path)
+                    sound.set_volume(volume)
+                    return sound
+                except pygame.error as e:
+                    print(f"Could not load hitsound {path}: {e}")
+        sound = self._synthesize(name, lane)
+        if sound is not None:
+            sound.set_volume(volume)
+        return sound
+
+    @staticmethod
+    def _synthesize(name, lane):
+        freq, size, channels = pygame.mixer.get_init()
+        if size == -16:
+            typecode, peak = "h", 32767
+        elif size == 32:
+            typecode, peak = "f", 1.0
+        else:
+            return None
+        pitches, length, decay = SYNTH_TONES[name]
+        pitch = pitches[lane]
+        samples = array(typecode)
+        for i in range(int(length * freq)):
+            t = i / freq
+            value = math.sin(2 * math.pi * pitch * t) * math.exp(-t * decay) * 0.8
+            samples.extend([type(peak)(value * peak)] * channels)
+        return pygame.mixer.Sound(buffer=samples.tobytes())
+
+    def play(self, lane, sound_id):
+        if not self.enabled:
+            return
+        sound = self.sounds[sound_id][lane]
+        if sound is None:
+            return
+        channels = self.channels
+        count = len(channels)
+        start = self.cursor
+        # First idle voice from the cursor on; if none, steal the voice at the cursor
+        for step in range(count):
+            index = (start + step) % count
+            if not channels[index].get_busy():
+                break
+        else:
+            index = start
+        channels[index].play(sound)
+        self.cursor = (index + 1) % count
+
+    def stop(self):
+        for channel in self.channels:
+            channel.stop()
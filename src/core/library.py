@@ -0,0 +1,119 @@
+import hashlib
+import os
+import sqlite3
+import time
+from contextlib import closing
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS songs (
+    name TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    fingerprint TEXT NOT NULL,
+    duration REAL,
+    tempo REAL,
+    beat_count INTEGER,
+    analyzed TEXT NOT NULL DEFAULT ''
+)
+"""
+
+class SongLibrary:
+    """Persistent index of the music folder, stored as SQLite in the cache dir.
+
+    Each public call opens its own short-lived connection, so the analysis
+    thread can record results while the menu reads.
+    """
+
+    def __init__(self, music_dir="assets/music", cache_dir="assets/cache"):
+        self.music_dir = music_dir
+        self.db_path = os.path.join(cache_dir, "library.db")
+        for directory in (music_dir, cache_dir):
+            if not os.path.exists(directory):
+                os.makedirs(directory)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path)
+
+    @staticmethod
+    def fingerprint(path, size, chunk=65536):
+        """Hash of the size plus the first and last 64 KiB, cheap enough for big libraries."""
+        digest = hashlib.md5(str(size).encode())
+        with open(path, 'rb') as f:
+            digest.update(f.read(chunk))
+            if size > chunk * 2:
+                f.seek(-chunk, os.SEEK_END)
+                digest.update(f.read(chunk))
+        return digest.hexdigest()
+
+    @staticmethod
+    def read_duration(path):
+        try:
+            from mutagen.mp3 import MP3
+            return MP3(path).info.length
+        except Exception as e:
+            print(f"Could not read duration of {path}: {e}")
+            return None
+
+    def songs(self):
+        """Every indexed song as of the last scan, without touching the music folder."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT name, duration, tempo, beat_count, analyzed FROM songs ORDER BY name").fetchall()
+        return [{"name": name, "duration": duration, "tempo": tempo, "beat_count": beat_count, "analyzed": analyzed}
+                for name, duration, tempo, beat_count, analyzed in rows]
+
+    def scan(self):
+        """Syncs the index with the music folder and returns every song, sorted by name.
+
+        Only files whose size or mtime changed since the last scan are opened.
+        """
+        t0 = time.perf_counter()
+        query = "SELECT name, size, mtime, duration, tempo, beat_count, analyzed FROM songs ORDER BY name"
+        with closing(self._connect()) as conn, conn:
+            rows = conn.execute(query).fetchall()
+            known = {row[0]: row for row in rows}
+            seen = set()
+            changed = []
+            with os.scandir(self.music_dir) as entries:
+                for entry in entries:
+                    if not entry.name.endswith(".mp3") or not entry.is_file():
+                        continue
+                    st = entry.stat()
+                    seen.add(entry.name)
+                    row = known.get(entry.name)
+                    if row is None or row[1] != st.st_size or row[2] != st.st_mtime:
+                        changed.append((entry.name, entry.path, st.st_size, st.st_mtime))
+
+            for name, path, size, mtime in changed:
+                conn.execute(
+                    "INSERT INTO songs (name, size, mtime, fingerprint, duration) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET size = excluded.size, mtime = excluded.mtime, "
+                    "fingerprint = excluded.fingerprint, duration = excluded.duration, "
+                    "tempo = NULL, beat_count = NULL, analyzed = ''",
+                    (name, size, mtime, self.fingerprint(path, size), self.read_duration(path)))
+            removed = [(name,) for name in known if name not in seen]
+            conn.executemany("DELETE FROM songs WHERE name = ?", removed)
+            if changed or removed:
+                rows = conn.execute(query).fetchall()
+        songs = [{"name": name, "duration": duration, "tempo": tempo, "beat_count": beat_count, "analyzed": analyzed}
+                 for name, _, _, duration, tempo, beat_count, analyzed in rows]
+        print(f"Library scan: {len(songs)} songs, {len(changed)} updated, {len(removed)} removed in {(time.perf_counter() - t0) * 1000:.1f} ms")
+        return songs
+
+    def fingerprint_of(self, name):
+        """Indexed content fingerprint of a song, or None if it isn't in the index."""
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT fingerprint FROM songs WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def record_analysis(self, name, difficulty, tempo, beat_count):
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute("SELECT analyzed FROM songs WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                return
+            analyzed = set(filter(None, row[0].split(",")))
+            analyzed.add(difficulty)
+            conn.execute(
+                "UPDATE songs SET tempo = COALESCE(?, tempo), beat_count = COALESCE(?, beat_count), analyzed = ? WHERE name = ?",
+                (tempo, beat_count, ",".join(sorted(analyzed)), name))
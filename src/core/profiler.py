@@ -0,0 +1,137 @@
+import json
+import os
+import time
+from array import array
+
+# Phase indices, in the order they happen inside one frame
+PHASE_EVENTS = 0
+PHASE_UPDATE = 1
+PHASE_TILES = 2
+PHASE_PARTICLES = 3
+PHASE_HUD = 4
+PHASE_FLIP = 5
+PHASE_NAMES = ["events", "update", "tiles", "particles", "hud", "flip"]
+
+COUNTER_NAMES = ["tiles", "particles", "texts"]
+
+
+class FrameProfiler:
+    """Per-phase frame timings kept in a preallocated ring buffer.
+
+    When disabled every call returns right after a single attribute check,
+    so the hooks can stay in the hot path permanently.
+    """
+
+    def __init__(self, enabled=False, capacity=1800):
+        self.enabled = enabled
+        self.overlay_visible = enabled
+        self.capacity = capacity
+        n_phases = len(PHASE_NAMES)
+        self.phase_times = array('d', [0.0]) * (capacity * n_phases)
+        self.frame_times = array('d', [0.0]) * capacity
+        self.counters = array('l', [0]) * (capacity * len(COUNTER_NAMES))
+        self.frame_index = 0
+        self.frames_recorded = 0
+        self._frame_start = 0.0
+        self._last_mark = 0.0
+        self._overlay_font = None
+
+    @classmethod
+    def from_env(cls):
+        return cls(enabled=os.environ.get("TILES_PROFILE", "0") not in ("", "0"))
+
+    def begin_frame(self):
+        if not self.enabled: return
+        base = self.frame_index * len(PHASE_NAMES)
+        for p in range(len(PHASE_NAMES)):
+            self.phase_times[base + p] = 0.0
+        now = time.perf_counter()
+        self._frame_start = now
+        self._last_mark = now
+
+    def mark(self, phase):
+        if not self.enabled: return
+        now = time.perf_counter()
+        self.phase_times[self.frame_index * len(PHASE_NAMES) + phase] += now - self._last_mark
+        self._last_mark = now
+
+    def end_frame(self, tiles=0, particles=0, texts=0):
+        if not self.enabled: return
+        i = self.frame_index
+        self.frame_times[i] = time.perf_counter() - self._frame_start
+        base = i * len(COUNTER_NAMES)
+        self.counters[base] = tiles
+        self.counters[base + 1] = particles
+        self.counters[base + 2] = texts
+        self.frame_index = (i + 1) % self.capacity
+        self.frames_recorded += 1
+
+    def toggle_overlay(self):
+        if self.enabled:
+            self.overlay_visible = not self.overlay_visible
+
+    def _ordered_slots(self):
+        count = min(self.frames_recorded, self.capacity)
+        start = (self.frame_index - count) % self.capacity
+        return [(start + k) % self.capacity for k in range(count)]
+
+    def snapshot(self):
+        """Returns the buffered frames, oldest first, as plain dicts."""
+        n_phases = len(PHASE_NAMES)
+        n_counters = len(COUNTER_NAMES)
+        frames = []
+        for slot in self._ordered_slots():
+            frames.append({
+                "frame_ms": self.frame_times[slot] * 1000.0,
+                "phases_ms": [self.phase_times[slot * n_phases + p] * 1000.0 for p in range(n_phases)],
+                "counts": [self.counters[slot * n_counters + c] for c in range(n_counters)],
+            })
+        return frames
+
+    def dump(self, path="profile_dump.json", reason="exit"):
+        if not self.enabled or self.frames_recorded == 0: return None
+        data = {
+            "reason": reason,
+            "created": time.time(),
+            "frames_recorded": self.frames_recorded,
+            "phases": PHASE_NAMES,
+            "counters": COUNTER_NAMES,
+            "frames": self.snapshot(),
+        }
+        with open(path, "w") as f:
+            json.dump(data, f)
+        print(f"Profiler dump written to {path} ({len(data['frames'])} frames)")
+        return path
+
+    def draw_overlay(self, screen):
+        if not self.enabled or not self.overlay_visible or self.frames_recorded == 0: return
+        import pygame
+        if self._overlay_font is None:
+            self._overlay_font = pygame.font.SysFont("Consolas", 13)
+
+        graph_w, graph_h = min(240, screen.get_width() - 20), 60
+        x0, y0 = 10, screen.get_height() - graph_h - 90
+        panel = pygame.Surface((graph_w, graph_h + 80), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+        screen.blit(panel, (x0, y0))
+
+        # Frame time graph, 33 ms full scale with a 16.7 ms budget line
+        slots = self._ordered_slots()[-graph_w:]
+        scale = graph_h / 33.3
+        budget_y = y0 + graph_h - int(16.7 * scale)
+        pygame.draw.line(screen, (80, 80, 80), (x0, budget_y), (x0 + graph_w, budget_y))
+        for k, slot in enumerate(slots):
+            ms = self.frame_times[slot] * 1000.0
+            h = min(graph_h, int(ms * scale))
+            color = (0, 184, 212) if ms <= 16.7 else (255, 80, 80)
+            pygame.draw.line(screen, color, (x0 + k, y0 + graph_h), (x0 + k, y0 + graph_h - h))
+
+        last = slots[-1]
+        n_phases = len(PHASE_NAMES)
+        phases = [f"{PHASE_NAMES[p][:3]}:{self.phase_times[last * n_phases + p] * 1000.0:.1f}" for p in range(n_phases)]
+        base = last * len(COUNTER_NAMES)
+        counts = " ".join(f"{COUNTER_NAMES[c]}:{self.counters[base + c]}" for c in range(len(COUNTER_NAMES)))
+        lines = [f"frame {self.frame_times[last] * 1000.0:.2f} ms", " ".join(phases[:3]), " ".join(phases[3:]), counts]
+        for k, line in enumerate(lines):
+            surf = self._overlay_font.render(line, True, (220, 220, 220))
+            screen.blit(surf, (x0 + 4, y0 + graph_h + 4 + k * 18))
@@ -0,0 +1,43 @@
+import importlib
+import json
+import threading
+import time
+
+
+class StartupTrace:
+    """Records import times and startup milestones relative to process start."""
+
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self.imports = []
+        self.marks = []
+        self._lock = threading.Lock()
+        self.reported = False
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.t0) * 1000.0
+
+    def timed_import(self, module_name):
+        start = time.perf_counter()
+        module = importlib.import_module(module_name)
+        duration = (time.perf_counter() - start) * 1000.0
+        with self._lock:
+            self.imports.append({"module": module_name, "ms": duration,
+                                 "thread": threading.current_thread().name})
+        return module
+
+    def mark(self, name):
+        with self._lock:
+            self.marks.append({"name": name, "at_ms": self.elapsed_ms()})
+
+    def report(self, path="startup_trace.json"):
+        with self._lock:
+            data = {"imports": list(self.imports), "marks": list(self.marks)}
+        print("Startup trace:")
+        for entry in data["imports"]:
+            print(f"  import {entry['module']:<32} {entry['ms']:8.1f} ms  [{entry['thread']}]")
+        for entry in data["marks"]:
+            print(f"  {entry['name']:<39} at {entry['at_ms']:8.1f} ms")
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+        self.reported = True
@@ -1,3 +1,4 @@
+import time
 from enum import Enum, auto
 
 class GameState(Enum):
@@ -10,11 +11,19 @@ class GameState(Enum):
 class StateManager:
     def __init__(self):
         self.state = GameState.MENU
+        self.previous_state = None
         self.context = {}
+        self.entered_at = time.perf_counter()
 
     def change_state(self, new_state, **context):
+        self.previous_state = self.state
         self.state = new_state
         self.context = context
+        self.entered_at = time.perf_counter()
 
     def get_state(self):
         return self.state
+
+    def time_in_state(self):
+        """Seconds since the last transition."""
+        return time.perf_counter() - self.entered_at
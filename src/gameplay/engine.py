@@ -1,88 +1,158 @@
 import pygame
 import random
-import src.core.constants as constants
-# We still import specific colors for convenience, but they are static
-from src.core.constants import COLOR_BG, COLOR_LANE_DIVIDER, COLOR_TILE, COLOR_TEXT, COLOR_ACCENT, LANE_WIDTH
+from bisect import bisect_left
+from src.core.constants import (COLOR_BG, COLOR_LANE_DIVIDER, COLOR_TILE, COLOR_TEXT, COLOR_ACCENT, LANE_NAMES,
+                                JUDGE_NAMES, JUDGE_WINDOWS, JUDGE_SCORES, JUDGE_COLORS, HOLD_RELEASE_GRACE,
+                                JUDGEMENT_SHOW_TIME)
 import math
 from src.core.messages import COMBO_MESSAGES
+from src.core.profiler import PHASE_TILES, PHASE_PARTICLES
+from src.gameplay.pool import EffectPool
+from src.gameplay.layout import Layout
+from src.gameplay.timing import TimingStats, HIST_WINDOW
+from src.core.hitsounds import SOUND_HIT, SOUND_HOLD, SOUND_MISS
+from src.gameplay.notes import NoteStore, flag_property, FLAG_CLICKED, FLAG_MISSED, FLAG_HOLDING, FLAG_HOLD_COMPLETE, FLAG_JUDGED
+
+# Lanes fed by the low / mid / high onset bands from BeatDetector
+BAND_LANES = ((0,), (1, 2), (3,))
+BAND_PEAK_WINDOW = 8  # beats either side forming the local median a band has to stand out from
+BAND_PEAK_MARGIN = 0.15  # how far above that median a band's strength must be to count as a peak
+
+def band_peaks(bands, window=BAND_PEAK_WINDOW, margin=BAND_PEAK_MARGIN):
+    """Per beat, the bands whose strength stands out from their own neighbourhood.
+
+    Strengths are normalized per band over the whole song, so most beats sit
+    high on every band; comparing against a local median keeps only real hits.
+    """
+    peaks = []
+    count = len(bands)
+    for i, strengths in enumerate(bands):
+        lo, hi = max(0, i - window), min(count, i + window + 1)
+        peaking = []
+        for band, strength in enumerate(strengths):
+            neighbourhood = sorted(bands[j][band] for j in range(lo, hi))
+            if strength >= neighbourhood[len(neighbourhood) // 2] + margin:
+                peaking.append(band)
+        peaks.append(peaking)
+    return peaks
 
 class FloatingText:
-    def __init__(self, text, x, y, color):
+    __slots__ = ("text", "x", "y", "color", "vx", "vy", "alpha", "life", "scale", "rotation", "surface", "size")
+    _font = None
+
+    def __init__(self, text="", x=0, y=0, color=COLOR_TEXT):
+        self.surface = None
+        self.reset(text, x, y, color)
+        self.life = 0.0
+
+    def reset(self, text, x, y, color, size=1.0):
         self.text = text
         self.x = x
         self.y = y
         self.color = color
-        self.vx = random.uniform(-100, 100)
-        self.vy = random.uniform(-300, -150)
+        self.size = size
+        self.vx = random.uniform(-100, 100) * size
+        self.vy = random.uniform(-300, -150) * size
         self.alpha = 255
         self.life = 2.0
         self.scale = 1.0
         self.rotation = random.uniform(-15, 15)
+        self.surface = None
 
     def update(self, dt):
         self.x += self.vx * dt
         self.y += self.vy * dt
-        self.vy += 400 * dt
+        self.vy += 400 * self.size * dt
         self.life -= dt
         self.alpha = int((self.life / 2.0) * 255)
         self.scale = 1.0 + (1.0 - (self.life / 2.0)) * 0.5
 
     def draw(self, screen):
         if self.alpha <= 0: return
-        font = pygame.font.SysFont("Outfit", 40, bold=True)
-        text_surf = font.render(self.text, True, self.color)
-        s = pygame.transform.rotozoom(text_surf, self.rotation, self.scale)
+        if self.surface is None:
+            if FloatingText._font is None:
+                FloatingText._font = pygame.font.SysFont("Outfit", 40, bold=True)
+            self.surface = FloatingText._font.render(self.text, True, self.color)
+        s = pygame.transform.rotozoom(self.surface, self.rotation, self.scale * self.size)
         s.set_alpha(self.alpha)
         rect = s.get_rect(center=(self.x, self.y))
         screen.blit(s, rect)
 
 class Particle:
-    def __init__(self, x, y, color):
+    __slots__ = ("x", "y", "color", "vx", "vy", "life", "size", "gravity")
+    # Solid squares shared by every particle, keyed by (color, size); alpha is set per blit
+    _surfaces = {}
+
+    def __init__(self, x=0, y=0, color=COLOR_ACCENT):
+        self.reset(x, y, color)
+        self.life = 0.0
+
+    def reset(self, x, y, color, scale=1.0):
         self.x = x
         self.y = y
         self.color = color
-        self.vx = random.uniform(-200, 200)
-        self.vy = random.uniform(-400, -100)
+        self.vx = random.uniform(-200, 200) * scale
+        self.vy = random.uniform(-400, -100) * scale
+        self.gravity = 800 * scale
         self.life = 1.0
-        self.size = random.randint(2, 6)
+        self.size = max(1, int(random.randint(2, 6) * scale))
 
     def update(self, dt):
         self.x += self.vx * dt
         self.y += self.vy * dt
-        self.vy += 800 * dt
+        self.vy += self.gravity * dt
         self.life -= dt
 
     def draw(self, screen):
         alpha = int(self.life * 255)
         if alpha > 0:
-            s = pygame.Surface((self.size, self.size), pygame.SRCALPHA)
-            pygame.draw.rect(s, (*self.color, alpha), (0, 0, self.size, self.size))
+            key = (self.color, self.size)
+            s = Particle._surfaces.get(key)
+            if s is None:
+                s = pygame.Surface((self.size, self.size))
+                s.fill(self.color)
+                Particle._surfaces[key] = s
+            s.set_alpha(alpha)
             screen.blit(s, (self.x, self.y))
 
 class Tile:
-    def __init__(self, lane, spawn_time, duration=0):
-        self.lane = lane
-        self.spawn_time = spawn_time
-        self.duration = duration
-        self.end_time = spawn_time + duration
-        self.clicked = False
-        self.missed = False
-        self.is_holding = False
-        self.hold_complete = False
-        self.hit_time_audio = None
+    """View over one note of a NoteStore, only alive while the note is on screen.
+
+    Purely visual: judgement reads and writes the NoteStore flags by time, and
+    the tile just follows them.
+    """
+    __slots__ = ("notes", "index", "layout", "width", "height", "lane", "spawn_time", "duration", "end_time", "opacity", "x", "y")
+
+    clicked = flag_property(FLAG_CLICKED)
+    missed = flag_property(FLAG_MISSED)
+    is_holding = flag_property(FLAG_HOLDING)
+    hold_complete = flag_property(FLAG_HOLD_COMPLETE)
+
+    def __init__(self, notes, index, layout):
+        self.notes = notes
+        self.index = index
+        self.layout = layout
+        self.width = layout.lane_width
+        self.height = layout.tile_height
+        self.lane = notes.lanes[index]
+        self.spawn_time = notes.times[index]
+        self.duration = notes.durations[index]
+        self.end_time = self.spawn_time + self.duration
         self.opacity = 255
-        self.width = LANE_WIDTH
-        self.height = 130
-        self.x = lane * LANE_WIDTH
+        self.x = layout.lane_x(self.lane)
         self.y = -self.height
 
+    def is_finished(self, speed):
+        if self.clicked or self.hold_complete:
+            return self.opacity <= 0
+        if self.missed:
+            return self.y - self.duration * speed > self.layout.height
+        return False
+
     def update(self, current_time, dt, speed):
-        hit_line_y = constants.SCREEN_HEIGHT - 150
+        hit_line_y = self.layout.hit_line_y
         if self.is_holding:
             self.y = hit_line_y
-            if current_time >= self.end_time:
-                self.is_holding = False
-                self.hold_complete = True
             return
         if self.clicked or self.hold_complete:
             self.opacity = max(0, self.opacity - 800 * dt)
@@ -96,32 +166,38 @@ class Tile:
         if self.is_holding: color = (50, 200, 255)
         elif self.clicked or self.hold_complete: color = (50, 255, 50)
         elif self.missed: color = (255, 50, 50)
-        tile_surf = pygame.Surface((self.width - 4, self.height), pygame.SRCALPHA)
+        px = self.layout.px
+        gap = px(2)
+        tile_surf = pygame.Surface((self.width - 2 * gap, self.height), pygame.SRCALPHA)
         color_with_alpha = (*color, self.opacity)
         if self.duration > 0 and not self.hold_complete:
             visible_start_time = max(current_time, self.spawn_time)
             remaining_duration = max(0, self.end_time - visible_start_time)
             trail_height = int(remaining_duration * speed)
             if trail_height > 0:
-                trail_surf = pygame.Surface((self.width - 8, trail_height), pygame.SRCALPHA)
+                trail_surf = pygame.Surface((self.width - 4 * gap, trail_height), pygame.SRCALPHA)
                 trail_color = (*color, int(self.opacity * 0.4))
-                pygame.draw.rect(trail_surf, trail_color, (0, 0, self.width - 8, trail_height), border_radius=4)
-                screen.blit(trail_surf, (self.x + 4, self.y - trail_height))
-            pygame.draw.rect(tile_surf, color_with_alpha, (0, 0, self.width - 4, self.height), border_radius=10)
-            pygame.draw.rect(tile_surf, (255, 255, 255, self.opacity), (0, 0, self.width - 4, self.height), 3, border_radius=10)
+                pygame.draw.rect(trail_surf, trail_color, (0, 0, self.width - 4 * gap, trail_height), border_radius=px(4))
+                screen.blit(trail_surf, (self.x + 2 * gap, self.y - trail_height))
+            pygame.draw.rect(tile_surf, color_with_alpha, (0, 0, self.width - 2 * gap, self.height), border_radius=px(10))
+            pygame.draw.rect(tile_surf, (255, 255, 255, self.opacity), (0, 0, self.width - 2 * gap, self.height), px(3), border_radius=px(10))
         else:
-            pygame.draw.rect(tile_surf, color_with_alpha, (0, 0, self.width - 4, self.height), border_radius=6)
-        screen.blit(tile_surf, (self.x + 2, self.y))
+            pygame.draw.rect(tile_surf, color_with_alpha, (0, 0, self.width - 2 * gap, self.height), border_radius=px(6))
+        screen.blit(tile_surf, (self.x + gap, self.y))
 
 class GameEngine:
-    def __init__(self, screen, song_path, difficulty="Normal", custom_settings=None, song_duration=0):
+    def __init__(self, screen, song_path, difficulty="Normal", custom_settings=None, song_duration=0, layout=None):
         self.screen = screen
+        self.layout = layout or Layout()
         self.song_path = song_path
         self.difficulty = difficulty
         self.custom_settings = custom_settings or {}
         self.song_duration = song_duration
+        self.notes = NoteStore()
         self.tiles = []
+        self.next_note = 0
         self.beat_timestamps = []
+        self.beat_bands = None
         self.score = 0
         self.combo = 0
         self.max_combo = 0
@@ -131,20 +207,37 @@ class GameEngine:
         self.is_ready = False
         diff_speeds = {"Easy": 350, "Normal": 500, "Hard": 700, "Insane": 900, "Impossible": 1200, "God": 1600, "Beyond": 2100}
         self.tile_speed = self.custom_settings.get("speed", diff_speeds.get(difficulty, 500))
-        self.particles = []
-        self.floating_texts = []
+        # Scroll speed in internal-surface pixels; tile_speed stays in design pixels
+        self.pixel_speed = self.tile_speed * self.layout.scale
+        self.particles = EffectPool(Particle, 512)
+        self.floating_texts = EffectPool(FloatingText, 16)
         self.damage_alpha = 0
         self.combo_scale = 1.0
         self.lane_pulses = [0.0] * 4
+        self.loop_start = None
+        self.loop_end = None
+        self.lane_cursor = [0, 0, 0, 0]
+        self.holding = [-1, -1, -1, -1]
+        self.reopened = []  # (note, window_start, window_end) of holds seek() gave a new window
+        self.last_judgement = -1
+        self.judgement_time = 0.0
+        self.judgement_surfaces = None
+        self.profiler = None
+        self.hitsounds = None
+        self.timing = TimingStats()
+        self.report_surface = None
         
-    def set_beats(self, beats):
+    def set_beats(self, beats, bands=None):
         self.beat_timestamps = beats
+        self.beat_bands = bands
         self.generate_tiles()
         self.countdown_start = pygame.time.get_ticks()
         self.is_ready = True
 
     def generate_tiles(self):
+        self.notes.clear()
         self.tiles = []
+        self.next_note = 0
         lane_map = []
         chord_chance = self.custom_settings.get("chord_chance", None)
         if chord_chance is None:
@@ -154,12 +247,19 @@ class GameEngine:
             elif self.difficulty == "Insane": chord_chance = 0.25
             else: chord_chance = 0.05
         hold_chance = self.custom_settings.get("hold_chance", 0.15)
-        for timestamp in self.beat_timestamps:
-            num_notes = 1
-            if random.random() < chord_chance:
-                max_notes = 3 if self.difficulty in ["Impossible", "God", "Beyond"] else 2
-                num_notes = random.randint(2, max_notes)
-            lanes = random.sample(range(4), num_notes)
+        max_notes = 3 if self.difficulty in ["Impossible", "God", "Beyond"] else 2
+        bands = self.beat_bands
+        if not bands or len(bands) != len(self.beat_timestamps):
+            bands = None
+        peaks = band_peaks(bands) if bands else None
+        for i, timestamp in enumerate(self.beat_timestamps):
+            if bands:
+                lanes = self.lanes_from_bands(bands[i], peaks[i], chord_chance, max_notes)
+            else:
+                num_notes = 1
+                if random.random() < chord_chance:
+                    num_notes = random.randint(2, max_notes)
+                lanes = random.sample(range(4), num_notes)
             lane_map.append((timestamp, lanes))
         for i, (timestamp, lanes) in enumerate(lane_map):
             for lane in lanes:
@@ -175,103 +275,219 @@ class GameEngine:
                     max_safe_duration = (next_time_in_lane - timestamp) - safety_gap
                     if max_safe_duration > 0.4:
                         duration = min(ideal_duration, max_safe_duration)
-                self.tiles.append(Tile(lane, timestamp, duration))
+                self.notes.append(lane, timestamp, duration)
+        self.notes.build_windows(JUDGE_WINDOWS[-1])
+        self.reopened = []
+        self.lane_cursor = [0, 0, 0, 0]
+        self.holding = [-1, -1, -1, -1]
+        self.timing.resize(len(self.notes))
+
+    def lanes_from_bands(self, strengths, peaking, chord_chance, max_notes):
+        """Lanes for one beat from its low / mid / high onset strengths.
+
+        Bass lands on the left, mids in the middle and highs on the right. Chords
+        only go where two or more bands peak together (see band_peaks), at the
+        chosen chord chance.
+        """
+        if len(peaking) >= 2 and random.random() < chord_chance:
+            peaking = sorted(peaking, key=lambda band: strengths[band], reverse=True)
+            return [random.choice(BAND_LANES[band]) for band in peaking[:max_notes]]
+        weights = [strength * strength for strength in strengths]
+        if sum(weights) <= 0:
+            return [random.randrange(4)]
+        band = random.choices(range(len(BAND_LANES)), weights=weights)[0]
+        return [random.choice(BAND_LANES[band])]
+
+    def activate_notes(self, current_time):
+        # Lead time for a note to scroll from above the screen down to the hit line
+        lead = (self.layout.height + self.layout.tile_height) / self.pixel_speed
+        times = self.notes.times
+        count = len(times)
+        while self.next_note < count and times[self.next_note] - lead <= current_time:
+            self.tiles.append(Tile(self.notes, self.next_note, self.layout))
+            self.next_note += 1
 
     def spawn_particles(self, x, y, color):
         for _ in range(15):
-            self.particles.append(Particle(x, y, color))
+            self.particles.spawn().reset(x, y, color, self.layout.scale)
 
     def spawn_shoutout(self, text):
-        self.floating_texts.append(FloatingText(text, constants.SCREEN_WIDTH // 2, constants.SCREEN_HEIGHT // 2, (255, 255, 0)))
+        self.floating_texts.spawn().reset(text, self.layout.width // 2, self.layout.height // 2, (255, 255, 0), self.layout.scale)
 
-    def restart(self):
+    def restart(self, start_time=0.0):
         self.score = 0
         self.combo = 0
         self.damage_alpha = 0
         self.lane_pulses = [0.0] * 4
-        self.floating_texts = []
+        self.floating_texts.clear()
+        self.timing.clear()
+        self.report_surface = None
         self.game_over = False
         self.countdown = 3
         self.countdown_start = pygame.time.get_ticks()
-        for tile in self.tiles:
-            tile.clicked = False
-            tile.missed = False
-            tile.is_holding = False
-            tile.hold_complete = False
-            tile.opacity = 255
-            tile.y = -tile.height
+        self.seek(start_time)
+
+    def seek(self, start_time):
+        """Rewinds or fast-forwards the chart to start_time.
+
+        Notes whose late window is still open stay judgeable, and a hold still
+        sounding at start_time gets a fresh window from there on.
+        """
+        notes = self.notes
+        for i, window_start, window_end in self.reopened:
+            notes.window_start[i] = window_start
+            notes.window_end[i] = window_end
+        self.reopened = []
+        first = bisect_left(notes.times, start_time - JUDGE_WINDOWS[-1])
+        notes.reset_flags(first)
+        self.tiles = []
+        self.next_note = first
+        for lane in range(4):
+            indices = notes.lane_notes[lane]
+            cursor = bisect_left(indices, first)
+            self.holding[lane] = -1
+            if cursor > 0:
+                i = indices[cursor - 1]
+                if notes.durations[i] > 0 and notes.times[i] + notes.durations[i] > start_time:
+                    self.reopened.append((i, notes.window_start[i], notes.window_end[i]))
+                    notes.window_start[i] = start_time
+                    notes.window_end[i] = start_time + JUDGE_WINDOWS[-1]
+                    notes.flags[i] = 0
+                    self.tiles.append(Tile(notes, i, self.layout))
+                    cursor -= 1
+            self.lane_cursor[lane] = cursor
+        self.last_judgement = -1
+        self.particles.clear()
+
+    def set_loop_start(self, current_time):
+        self.loop_start = current_time
+        if self.loop_end is not None and self.loop_end <= current_time:
+            self.loop_end = None
+
+    def set_loop_end(self, current_time):
+        """Closes the A-B practice section; returns True when the loop is active."""
+        if self.loop_start is None or current_time <= self.loop_start:
+            return False
+        self.loop_end = current_time
+        return True
+
+    def clear_loop(self):
+        self.loop_start = None
+        self.loop_end = None
 
     def update(self, current_time, dt):
         if self.is_ready and self.beat_timestamps and current_time >= self.beat_timestamps[-1] + 2.0:
             self.game_over = True
+            self.last_judgement = -1
+        self.judge_timeouts(current_time, dt)
+        self.activate_notes(current_time)
+        finished = False
         for tile in self.tiles:
-            was_holding = tile.is_holding
-            tile.update(current_time, dt, self.tile_speed)
-            if tile.is_holding:
-                self.score += int(100 * dt)
-            if was_holding and tile.hold_complete:
-                self.increment_combo()
-            if not tile.clicked and not tile.missed and not tile.is_holding and not tile.hold_complete:
-                if tile.y > constants.SCREEN_HEIGHT:
-                    tile.missed = True
-                    self.trigger_damage()
-        self.particles = [p for p in self.particles if p.life > 0]
-        for p in self.particles: p.update(dt)
-        self.floating_texts = [t for t in self.floating_texts if t.life > 0]
-        for t in self.floating_texts: t.update(dt)
+            tile.update(current_time, dt, self.pixel_speed)
+            if tile.is_finished(self.pixel_speed):
+                finished = True
+        if finished:
+            self.tiles = [t for t in self.tiles if not t.is_finished(self.pixel_speed)]
+        self.particles.update(dt)
+        self.floating_texts.update(dt)
         self.damage_alpha = max(0, self.damage_alpha - 400 * dt)
         self.combo_scale = max(1.0, self.combo_scale - 5 * dt)
         for i in range(4):
             self.lane_pulses[i] = max(0.0, self.lane_pulses[i] - 4.0 * dt)
 
+    def judge_timeouts(self, current_time, dt):
+        """Misses every note whose window has closed and finishes holds that reached their end."""
+        notes = self.notes
+        flags = notes.flags
+        window_end = notes.window_end
+        for lane in range(4):
+            held = self.holding[lane]
+            if held >= 0:
+                self.score += int(100 * dt)
+                if current_time >= notes.times[held] + notes.durations[held]:
+                    self.finish_hold(lane)
+            indices = notes.lane_notes[lane]
+            cursor = self.lane_cursor[lane]
+            while cursor < len(indices):
+                i = indices[cursor]
+                if flags[i] & FLAG_JUDGED:
+                    cursor += 1
+                elif window_end[i] < current_time:
+                    flags[i] |= FLAG_MISSED
+                    self.timing.record_miss(lane)
+                    self.trigger_damage()
+                    cursor += 1
+                else:
+                    break
+            self.lane_cursor[lane] = cursor
+
+    def finish_hold(self, lane):
+        i = self.holding[lane]
+        self.notes.flags[i] = (self.notes.flags[i] & ~FLAG_HOLDING) | FLAG_HOLD_COMPLETE
+        self.holding[lane] = -1
+        self.increment_combo()
+
     def trigger_damage(self):
         self.damage_alpha = 180
         self.combo = 0
 
+    def judge(self, offset):
+        """Grade index into JUDGE_NAMES for a signed press offset; the window check is done by the caller."""
+        offset = abs(offset)
+        for grade, window in enumerate(JUDGE_WINDOWS):
+            if offset <= window:
+                return grade
+        return len(JUDGE_WINDOWS) - 1
+
     def handle_keydown(self, lane_index, current_time):
+        """Judges a press purely against the audio clock and the precomputed note windows."""
         self.lane_pulses[lane_index] = 1.0
-        hit_line_y = constants.SCREEN_HEIGHT - 150
-        tolerance = 120
-        target_tile = None
-        min_dist = 9999
-        for tile in self.tiles:
-            if tile.lane == lane_index and tile.is_holding:
-                tile.is_holding = False
-                tile.hold_complete = True
-                self.increment_combo()
-                break
-        for tile in self.tiles:
-            if tile.lane == lane_index and not tile.clicked and not tile.missed and not tile.is_holding and not tile.hold_complete:
-                dist = abs(tile.y - hit_line_y)
-                if dist < min_dist:
-                    min_dist = dist
-                    target_tile = tile
-        if target_tile and min_dist < tolerance:
-            if target_tile.duration > 0:
-                target_tile.is_holding = True
-                target_tile.hit_time_audio = current_time
-            else:
-                target_tile.clicked = True
-                self.score += 10
-                self.increment_combo()
-            color = (0, 184, 212) if self.combo < 10 else (255, 215, 0)
-            self.spawn_particles(target_tile.x + LANE_WIDTH//2, hit_line_y, color)
-            return True
+        if self.holding[lane_index] >= 0:
+            self.finish_hold(lane_index)
+        notes = self.notes
+        indices = notes.lane_notes[lane_index]
+        cursor = self.lane_cursor[lane_index]
+        while cursor < len(indices) and notes.flags[indices[cursor]] & FLAG_JUDGED:
+            cursor += 1
+        self.lane_cursor[lane_index] = cursor
+        if cursor < len(indices):
+            i = indices[cursor]
+            if notes.window_start[i] <= current_time <= notes.window_end[i]:
+                # A hold reopened by seek() is timed from where its window opened
+                offset = current_time - max(notes.times[i], notes.window_start[i])
+                grade = self.judge(offset)
+                self.timing.record(lane_index, offset, grade)
+                self.last_judgement = grade
+                self.judgement_time = current_time
+                self.score += JUDGE_SCORES[grade]
+                if notes.durations[i] > 0:
+                    notes.flags[i] |= FLAG_HOLDING
+                    self.holding[lane_index] = i
+                    if self.hitsounds: self.hitsounds.play(lane_index, SOUND_HOLD)
+                else:
+                    notes.flags[i] |= FLAG_CLICKED
+                    self.increment_combo()
+                    if self.hitsounds: self.hitsounds.play(lane_index, SOUND_HIT)
+                self.lane_cursor[lane_index] = cursor + 1
+                color = (0, 184, 212) if self.combo < 10 else (255, 215, 0)
+                self.spawn_particles(self.layout.lane_x(lane_index) + self.layout.lane_width // 2, self.layout.hit_line_y, color)
+                return True
+        if self.hitsounds: self.hitsounds.play(lane_index, SOUND_MISS)
+        self.timing.record_ghost(lane_index)
         self.trigger_damage()
         return False
 
     def handle_keyup(self, lane_index, current_time):
-        for tile in self.tiles:
-            if tile.lane == lane_index and tile.is_holding:
-                if current_time >= tile.end_time - 0.1:
-                    tile.is_holding = False
-                    tile.hold_complete = True
-                    self.increment_combo()
-                else:
-                    tile.is_holding = False
-                    tile.missed = True
-                    self.trigger_damage()
-                return
+        i = self.holding[lane_index]
+        if i < 0:
+            return
+        if current_time >= self.notes.times[i] + self.notes.durations[i] - HOLD_RELEASE_GRACE:
+            self.finish_hold(lane_index)
+        else:
+            self.notes.flags[i] = (self.notes.flags[i] & ~FLAG_HOLDING) | FLAG_MISSED
+            self.holding[lane_index] = -1
+            self.timing.record_miss(lane_index)
+            self.trigger_damage()
 
     def increment_combo(self):
         self.combo += 1
@@ -281,46 +497,139 @@ class GameEngine:
             self.spawn_shoutout(COMBO_MESSAGES[self.combo])
 
     def draw(self, current_time):
-        screen_w = constants.SCREEN_WIDTH
-        screen_h = constants.SCREEN_HEIGHT
-        hit_line_y = screen_h - 150
+        layout = self.layout
+        px = layout.px
+        screen_w = layout.width
+        screen_h = layout.height
+        lane_w = layout.lane_width
+        hit_line_y = layout.hit_line_y
+        zone_h = layout.hit_zone_height
         
         for i in range(1, 4):
-            pygame.draw.line(self.screen, COLOR_LANE_DIVIDER, (i * LANE_WIDTH, 0), (i * LANE_WIDTH, screen_h))
+            pygame.draw.line(self.screen, COLOR_LANE_DIVIDER, (i * lane_w, 0), (i * lane_w, screen_h))
         
-        pygame.draw.rect(self.screen, (25, 25, 25), (0, hit_line_y - 30, screen_w, 60))
+        pygame.draw.rect(self.screen, (25, 25, 25), (0, hit_line_y - zone_h // 2, screen_w, zone_h))
         for i in range(4):
             intensity = self.lane_pulses[i]
-            x_start = i * LANE_WIDTH
+            x_start = layout.lane_x(i)
             pulse_color = [min(255, c + int(intensity * 100)) for c in COLOR_ACCENT]
-            thickness = 3 + int(intensity * 10)
+            thickness = px(3 + intensity * 10)
             if intensity > 0:
-                glow_surf = pygame.Surface((LANE_WIDTH, 60), pygame.SRCALPHA)
+                glow_surf = pygame.Surface((lane_w, zone_h), pygame.SRCALPHA)
                 glow_alpha = int(intensity * 100)
-                pygame.draw.rect(glow_surf, (*COLOR_ACCENT, glow_alpha), (0, 0, LANE_WIDTH, 60))
-                self.screen.blit(glow_surf, (x_start, hit_line_y - 30))
-            pygame.draw.line(self.screen, pulse_color, (x_start, hit_line_y), (x_start + LANE_WIDTH, hit_line_y), thickness)
+                pygame.draw.rect(glow_surf, (*COLOR_ACCENT, glow_alpha), (0, 0, lane_w, zone_h))
+                self.screen.blit(glow_surf, (x_start, hit_line_y - zone_h // 2))
+            pygame.draw.line(self.screen, pulse_color, (x_start, hit_line_y), (x_start + lane_w, hit_line_y), thickness)
         for tile in self.tiles:
-            if -500 < tile.y < screen_h + 100 or tile.clicked or tile.is_holding or tile.hold_complete:
-                tile.draw(self.screen, self.tile_speed, current_time)
+            if -px(500) < tile.y < screen_h + px(100) or tile.clicked or tile.is_holding or tile.hold_complete:
+                tile.draw(self.screen, self.pixel_speed, current_time)
+        if self.profiler: self.profiler.mark(PHASE_TILES)
         for p in self.particles: p.draw(self.screen)
         for t in self.floating_texts: t.draw(self.screen)
+        if self.profiler: self.profiler.mark(PHASE_PARTICLES)
         if self.damage_alpha > 0:
             border_surf = pygame.Surface((screen_w, screen_h), pygame.SRCALPHA)
-            pygame.draw.rect(border_surf, (255, 0, 0, int(self.damage_alpha)), (0, 0, screen_w, screen_h), 30)
+            pygame.draw.rect(border_surf, (255, 0, 0, int(self.damage_alpha)), (0, 0, screen_w, screen_h), px(30))
             self.screen.blit(border_surf, (0, 0))
-        main_font = pygame.font.SysFont("Outfit", 50, bold=True)
+        main_font = pygame.font.SysFont("Outfit", px(50), bold=True)
         score_surf = main_font.render(str(self.score), True, COLOR_TEXT)
-        self.screen.blit(score_surf, (screen_w // 2 - score_surf.get_width() // 2, 50))
+        self.screen.blit(score_surf, (screen_w // 2 - score_surf.get_width() // 2, px(50)))
         if self.combo > 1:
-            combo_font = pygame.font.SysFont("Outfit", int(30 * self.combo_scale), bold=True)
+            combo_font = pygame.font.SysFont("Outfit", px(30 * self.combo_scale), bold=True)
             combo_surf = combo_font.render(f"{self.combo} COMBO", True, (255, 215, 0) if self.combo >= 10 else COLOR_ACCENT)
-            self.screen.blit(combo_surf, (screen_w // 2 - combo_surf.get_width() // 2, 110))
-        diff_font = pygame.font.SysFont("Outfit", 18)
+            self.screen.blit(combo_surf, (screen_w // 2 - combo_surf.get_width() // 2, px(110)))
+        if self.last_judgement >= 0 and 0 <= current_time - self.judgement_time < JUDGEMENT_SHOW_TIME:
+            self.draw_judgement(current_time)
+        diff_font = pygame.font.SysFont("Outfit", px(18))
         diff_surf = diff_font.render(f"Difficulty: {self.difficulty}", True, (100, 100, 100))
-        self.screen.blit(diff_surf, (10, 10))
+        self.screen.blit(diff_surf, (px(10), px(10)))
+        if self.loop_start is not None:
+            loop_end = f"{self.loop_end:.1f}s" if self.loop_end is not None else "..."
+            loop_surf = diff_font.render(f"Practice A-B: {self.loop_start:.1f}s - {loop_end}", True, COLOR_ACCENT)
+            self.screen.blit(loop_surf, (px(10), px(32)))
         
         self.draw_timer(current_time)
+        if self.game_over:
+            if self.report_surface is None:
+                self.report_surface = self.render_timing_report()
+            self.screen.blit(self.report_surface, ((screen_w - self.report_surface.get_width()) // 2, px(150)))
+
+    def draw_judgement(self, current_time):
+        """Grade of the last hit just above the hit line, fading out; the labels are rendered once."""
+        px = self.layout.px
+        if self.judgement_surfaces is None:
+            font = pygame.font.SysFont("Outfit", px(34), bold=True)
+            self.judgement_surfaces = [font.render(name, True, color) for name, color in zip(JUDGE_NAMES, JUDGE_COLORS)]
+        surf = self.judgement_surfaces[self.last_judgement]
+        surf.set_alpha(int(255 * (1 - (current_time - self.judgement_time) / JUDGEMENT_SHOW_TIME)))
+        y = self.layout.hit_line_y - self.layout.tile_height - px(60)
+        self.screen.blit(surf, ((self.layout.width - surf.get_width()) // 2, y))
+
+    def export_timing(self, reason):
+        return self.timing.export({
+            "song": self.song_path,
+            "difficulty": self.difficulty,
+            "speed": self.tile_speed,
+            "score": self.score,
+            "max_combo": self.max_combo,
+            "reason": reason,
+        })
+
+    def render_timing_report(self):
+        """Game-over panel: offset histogram, mean / stddev and per-lane rows. Built once per game over."""
+        px = self.layout.px
+        summary = self.timing.summary()
+        bins = self.timing.histogram()
+        width, height = self.layout.width - px(40), px(320)
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 200))
+        title_font = pygame.font.SysFont("Outfit", px(28), bold=True)
+        font = pygame.font.SysFont("Consolas", px(15))
+
+        def fmt(value):
+            return "--" if value is None else f"{value:+.1f}"
+
+        y = px(12)
+        title = title_font.render("TIMING", True, COLOR_ACCENT)
+        panel.blit(title, ((width - title.get_width()) // 2, y))
+        y += title.get_height() + px(8)
+        lines = [
+            f"mean {fmt(summary['mean_ms'])} ms   stddev {summary['stddev_ms'] or 0:.1f} ms",
+            f"early {summary['early']}  late {summary['late']}  miss {summary['misses']}  ghost {summary['ghosts']}",
+            "  ".join(f"{name.lower()} {count}" for name, count in zip(JUDGE_NAMES, summary["grades"])),
+        ]
+        for line in lines:
+            surf = font.render(line, True, COLOR_TEXT)
+            panel.blit(surf, (px(14), y))
+            y += surf.get_height() + px(2)
+
+        # Histogram, early on the left, late on the right
+        y += px(8)
+        graph_x, graph_w, graph_h = px(14), width - px(28), px(110)
+        peak = max(bins) or 1
+        bar_w = graph_w / len(bins)
+        for b, count in enumerate(bins):
+            bar_h = int(graph_h * count / peak)
+            color = COLOR_ACCENT if b < len(bins) // 2 else (255, 160, 60)
+            pygame.draw.rect(panel, color, (graph_x + int(b * bar_w), y + graph_h - bar_h, max(1, int(bar_w) - 1), bar_h))
+        mid_x = graph_x + graph_w // 2
+        pygame.draw.line(panel, (200, 200, 200), (mid_x, y), (mid_x, y + graph_h))
+        pygame.draw.line(panel, (90, 90, 90), (graph_x, y + graph_h), (graph_x + graph_w, y + graph_h))
+        y += graph_h + px(4)
+        edge = int(HIST_WINDOW * 1000)
+        for text, x in ((f"-{edge} ms", graph_x), ("0", mid_x), (f"+{edge} ms", graph_x + graph_w)):
+            surf = font.render(text, True, (140, 140, 140))
+            panel.blit(surf, (min(max(graph_x, x - surf.get_width() // 2), graph_x + graph_w - surf.get_width()), y))
+        y += font.get_height() + px(10)
+
+        for lane, data in enumerate(summary["lanes"]):
+            line = f"{LANE_NAMES[lane]}  {fmt(data['mean_ms']):>6} ms  sd {data['stddev_ms'] or 0:5.1f}  n {data['count']:<4} miss {data['misses']}"
+            surf = font.render(line, True, COLOR_TEXT)
+            panel.blit(surf, (px(14), y))
+            y += surf.get_height() + px(2)
+        hint = font.render("R: retry   ESC: menu", True, (140, 140, 140))
+        panel.blit(hint, ((width - hint.get_width()) // 2, height - hint.get_height() - px(10)))
+        return panel
 
     def draw_timer(self, current_time):
         if self.song_duration <= 0: return
@@ -330,12 +639,13 @@ class GameEngine:
         remaining = max(0, int(self.song_duration - current_time))
         
         # Positioning (Top Right)
-        center_x, center_y = constants.SCREEN_WIDTH - 60, 60
-        radius = 35
+        px = self.layout.px
+        center_x, center_y = self.layout.width - px(60), px(60)
+        radius = px(35)
         rect = pygame.Rect(center_x - radius, center_y - radius, radius * 2, radius * 2)
         
         # 1. Background Circle (Grey)
-        pygame.draw.circle(self.screen, (40, 40, 40), (center_x, center_y), radius, 5)
+        pygame.draw.circle(self.screen, (40, 40, 40), (center_x, center_y), radius, px(5))
         
         # 2. Progress Arc (Cyan)
         # Angle in radians. Start at top (-pi/2) and go clockwise.
@@ -347,13 +657,13 @@ class GameEngine:
         
         # Fix: Pygame requires start_angle < stop_angle.
         # So for a sweep, we use (end_angle, start_angle)
-        pygame.draw.arc(self.screen, COLOR_ACCENT, rect, min(start_angle, end_angle), max(start_angle, end_angle), 6)
+        pygame.draw.arc(self.screen, COLOR_ACCENT, rect, min(start_angle, end_angle), max(start_angle, end_angle), px(6))
         
         # 3. Digital Clock
         minutes = remaining // 60
         seconds = remaining % 60
         time_str = f"{minutes:02}:{seconds:02}"
-        font = pygame.font.SysFont("Outfit", 22, bold=True)
+        font = pygame.font.SysFont("Outfit", px(22), bold=True)
         time_surf = font.render(time_str, True, COLOR_TEXT)
         # Position to the left of the circle
-        self.screen.blit(time_surf, (center_x - radius - 70, center_y - time_surf.get_height() // 2))
+        self.screen.blit(time_surf, (center_x - radius - px(70), center_y - time_surf.get_height() // 2))
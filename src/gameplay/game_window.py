@@ -0,0 +1,260 @@
+import pygame
+import os
+import time
+import traceback
+
+from src.core.constants import FPS, LANE_KEYS, SEEK_STEP, COLOR_BG, COLOR_ACCENT, AUDIO_BUFFER
+from src.core.state_manager import GameState
+from src.core.audio_manager import AudioManager
+from src.core.hitsounds import HitSounds
+from src.gameplay.engine import GameEngine
+from src.gameplay.layout import Layout
+from src.core.profiler import PHASE_EVENTS, PHASE_UPDATE, PHASE_HUD, PHASE_FLIP
+
+class GameWindow:
+    """The pygame half of the app: one display, one mixer and the gameplay loop.
+
+    Imported and created only when the first song is picked, so the dashboard
+    never waits for pygame.
+    """
+
+    def __init__(self, state_manager, profiler, gc_policy):
+        pygame.mixer.pre_init(buffer=AUDIO_BUFFER)
+        pygame.init() # Init once here
+        self.state_manager = state_manager
+        self.profiler = profiler
+        self.gc_policy = gc_policy
+        self.audio_manager = AudioManager()
+        self.hitsounds = HitSounds.from_env()
+        self.game_engine = None
+        self.screen = None
+        self.canvas = None
+        self.layout = None
+        self.window_size = None
+        self.present_key = None
+        self.present_target = None
+        self.present_pos = (0, 0)
+        self.clock = None
+        self.running = True
+
+    def init_game(self, song_name, difficulty, beats, bands, custom_settings, duration=None):
+        print("Initializing game...")
+        render_scale = custom_settings.get("render_scale", 1.0)
+        if self.screen is None:
+            pygame.display.init()
+            self.layout = Layout(render_scale=render_scale)
+
+            # Get Monitor Height for vertical maximization
+            info = pygame.display.Info()
+            # Set height to monitor height minus a small margin for window borders/taskbar
+            max_h = info.current_h - 100
+
+            self.screen = pygame.display.set_mode(self.layout.window_size(max_h), pygame.RESIZABLE)
+            self.clock = pygame.time.Clock()
+        else:
+            if render_scale != self.layout.scale:
+                self.layout = Layout(render_scale=render_scale)
+            self.set_window_visible(True)
+        if self.canvas is None or self.canvas.get_size() != (self.layout.width, self.layout.height):
+            self.canvas = pygame.Surface((self.layout.width, self.layout.height)).convert()
+            self.present_key = None
+            print(f"Render target {self.layout.width}x{self.layout.height} ({self.layout.scale:.0%}) -> window {self.screen.get_width()}x{self.screen.get_height()}")
+        pygame.display.set_caption(f"Playing: {song_name}")
+        pygame.event.clear()
+
+        song_path = os.path.join("assets/music", song_name)
+        if not self.audio_manager.load_song(song_path, duration):
+            print("Failed to load song audio.")
+            return False
+        duration = self.audio_manager.song_duration
+        self.game_engine = GameEngine(self.canvas, song_path, difficulty, custom_settings, duration, self.layout)
+        self.game_engine.profiler = self.profiler
+        self.game_engine.hitsounds = self.hitsounds
+        self.game_engine.set_beats(beats, bands)
+        print(f"Game ready in {self.state_manager.time_in_state() * 1000:.1f} ms")
+        self.state_manager.change_state(GameState.COUNTDOWN)
+        self.gc_policy.enter_song()
+        print("Game state is now COUNTDOWN")
+        return True
+
+    def set_window_visible(self, visible):
+        """Shows or hides the game window without destroying the display."""
+        try:
+            from pygame._sdl2.video import Window
+            window = Window.from_display_module()
+            if visible:
+                window.show()
+                window.focus()
+            else:
+                window.hide()
+        except (ImportError, AttributeError, pygame.error):
+            # Without _sdl2 a window can't be hidden and shown again, so close it and open a new one of the same size
+            if visible:
+                if pygame.display.get_surface() is None:
+                    pygame.display.init()
+                    self.screen = pygame.display.set_mode(self.window_size, pygame.RESIZABLE)
+                    self.present_key = None
+            else:
+                self.window_size = self.screen.get_size()
+                pygame.display.quit()
+
+    def run_game_loop(self):
+        print("Entering game loop...")
+        frame_count = 0
+        while self.running:
+            dt = self.clock.tick(FPS) / 1000.0
+            self.profiler.begin_frame()
+            if not self.handle_events():
+                print("Exit signal via events.")
+                break
+            self.profiler.mark(PHASE_EVENTS)
+
+            try:
+                self.update(dt)
+                self.profiler.mark(PHASE_UPDATE)
+                self.draw()
+                self.present()
+                self.profiler.draw_overlay(self.screen)
+                self.profiler.mark(PHASE_HUD)
+                pygame.display.flip()
+                self.profiler.mark(PHASE_FLIP)
+                if self.game_engine:
+                    self.profiler.end_frame(len(self.game_engine.tiles), len(self.game_engine.particles), len(self.game_engine.floating_texts))
+                else:
+                    self.profiler.end_frame()
+                frame_count += 1
+                if frame_count % 300 == 0:
+                    print(f"Loop heartbeat: frame={frame_count} | state={self.state_manager.get_state()}")
+            except Exception as e:
+                msg = traceback.format_exc()
+                with open("crash_log.txt", "a") as f:
+                    f.write("\nLoop Error:\n" + msg)
+                print(f"Loop Error: {e}")
+                self.profiler.dump(reason="crash")
+                break
+
+        print("Exiting game loop...")
+        self.profiler.dump()
+        if self.game_engine:
+            self.game_engine.export_timing("exit")
+        self.gc_policy.leave_song()
+        self.audio_manager.stop()
+        self.hitsounds.stop()
+        self.set_window_visible(False)
+        self.state_manager.change_state(GameState.MENU)
+
+    def handle_events(self):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                self.running = False
+                return False
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                self.profiler.toggle_overlay()
+                continue
+
+            state = self.state_manager.get_state()
+            if state == GameState.GAMEPLAY:
+                if event.type == pygame.KEYDOWN:
+                    current_time = self.audio_manager.get_pos()
+                    if event.key in LANE_KEYS:
+                        lane_idx = LANE_KEYS.index(event.key)
+                        self.game_engine.handle_keydown(lane_idx, current_time)
+                    elif event.key == pygame.K_ESCAPE:
+                        return False
+                    elif event.key == pygame.K_BACKSPACE:
+                        self.retry()
+                    elif event.key == pygame.K_LEFT:
+                        self.seek(current_time - SEEK_STEP)
+                    elif event.key == pygame.K_RIGHT:
+                        self.seek(current_time + SEEK_STEP)
+                    elif event.key == pygame.K_LEFTBRACKET:
+                        self.game_engine.set_loop_start(current_time)
+                    elif event.key == pygame.K_RIGHTBRACKET:
+                        if self.game_engine.set_loop_end(current_time):
+                            self.seek(self.game_engine.loop_start)
+                    elif event.key == pygame.K_BACKSLASH:
+                        self.game_engine.clear_loop()
+                elif event.type == pygame.KEYUP:
+                    if event.key in LANE_KEYS:
+                        lane_idx = LANE_KEYS.index(event.key)
+                        current_time = self.audio_manager.get_pos()
+                        self.game_engine.handle_keyup(lane_idx, current_time)
+            elif state in [GameState.GAME_OVER, GameState.COUNTDOWN]:
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                    return False
+                if state == GameState.GAME_OVER and event.type == pygame.KEYDOWN and event.key == pygame.K_r:
+                    self.game_engine.restart()
+                    self.state_manager.change_state(GameState.COUNTDOWN)
+                    self.gc_policy.enter_song()
+        return True
+
+    def seek(self, position):
+        position = self.audio_manager.seek(position)
+        self.game_engine.seek(position)
+
+    def retry(self):
+        """Restarts the song (or the practice section) in place, keeping the window, menu and decoded song."""
+        t0 = time.perf_counter()
+        self.game_engine.export_timing("retry")
+        start = self.game_engine.loop_start or 0.0
+        self.game_engine.restart(start)
+        self.audio_manager.play(start=start)
+        self.state_manager.change_state(GameState.GAMEPLAY)
+        print(f"Retry ready in {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+    def update(self, dt):
+        state = self.state_manager.get_state()
+        if state == GameState.COUNTDOWN:
+            elapsed = (pygame.time.get_ticks() - self.game_engine.countdown_start) / 1000.0
+            if elapsed >= 3.0:
+                self.state_manager.change_state(GameState.GAMEPLAY)
+                self.audio_manager.play()
+            else:
+                self.game_engine.countdown = 3 - int(elapsed)
+        elif state == GameState.GAMEPLAY:
+            if self.game_engine:
+                current_time = self.audio_manager.get_pos()
+                loop_end = self.game_engine.loop_end
+                if loop_end is not None and current_time >= loop_end:
+                    self.seek(self.game_engine.loop_start)
+                    current_time = self.audio_manager.get_pos()
+                self.game_engine.update(current_time, dt)
+
+                if self.game_engine.game_over:
+                    self.audio_manager.stop()
+                    self.gc_policy.leave_song()
+                    self.game_engine.export_timing("game_over")
+                    self.state_manager.change_state(GameState.GAME_OVER)
+
+    def draw(self):
+        self.canvas.fill(COLOR_BG)
+        state = self.state_manager.get_state()
+        if state in [GameState.COUNTDOWN, GameState.GAMEPLAY, GameState.GAME_OVER]:
+            if self.game_engine:
+                current_time = self.audio_manager.get_pos()
+                self.game_engine.draw(current_time)
+            if state == GameState.COUNTDOWN:
+                font = pygame.font.SysFont("Arial", self.layout.px(140), bold=True)
+                text = font.render(str(self.game_engine.countdown), True, COLOR_ACCENT)
+                self.canvas.blit(text, (self.layout.width//2 - text.get_width()//2, self.layout.height//2 - text.get_height()//2))
+
+    def present(self):
+        """Scales the internal canvas into the window, letterboxed to the design aspect ratio."""
+        self.screen = pygame.display.get_surface()
+        window_size = self.screen.get_size()
+        if window_size != self.present_key:
+            self.present_key = window_size
+            rect = self.layout.fit(window_size)
+            self.screen.fill((0, 0, 0))
+            self.present_target = None if rect.size == self.canvas.get_size() else self.screen.subsurface(rect)
+            self.present_pos = rect.topleft
+        if self.present_target is None:
+            self.screen.blit(self.canvas, self.present_pos)
+        elif self.layout.scale < 1.0:
+            # Reduced render scale is for slow machines, so take the cheaper nearest-neighbour filter
+            pygame.transform.scale(self.canvas, self.present_target.get_size(), self.present_target)
+        else:
+            pygame.transform.smoothscale(self.canvas, self.present_target.get_size(), self.present_target)
+
+    def cleanup(self):
+        pygame.quit()
@@ -0,0 +1,41 @@
+import pygame
+
+from src.core.constants import SCREEN_WIDTH, SCREEN_HEIGHT
+
+class Layout:
+    """Gameplay geometry for the internal render surface.
+
+    Everything is designed at SCREEN_WIDTH x SCREEN_HEIGHT and multiplied by
+    render_scale, so the engine draws the same picture at 50% or 100% and the
+    window just scales it up.
+    """
+
+    def __init__(self, width=SCREEN_WIDTH, height=SCREEN_HEIGHT, render_scale=1.0):
+        self.design_width = width
+        self.design_height = height
+        self.scale = min(1.0, max(0.5, render_scale))
+        self.width = self.px(width)
+        self.height = self.px(height)
+        self.lane_width = self.width // 4
+        self.tile_height = self.px(130)
+        self.hit_line_y = self.height - self.px(150)
+        self.hit_zone_height = self.px(60)
+
+    def px(self, value):
+        """Design pixels to internal-surface pixels."""
+        return max(1, int(round(value * self.scale)))
+
+    def lane_x(self, lane):
+        return lane * self.lane_width
+
+    def window_size(self, max_height):
+        """Largest window of the design aspect ratio that fits max_height."""
+        height = max(1, max_height)
+        return max(1, round(height * self.design_width / self.design_height)), height
+
+    def fit(self, window_size):
+        """Centered rect of the design aspect ratio inside the window (letterboxed)."""
+        win_w, win_h = window_size
+        zoom = min(win_w / self.design_width, win_h / self.design_height)
+        w, h = max(1, int(self.design_width * zoom)), max(1, int(self.design_height * zoom))
+        return pygame.Rect((win_w - w) // 2, (win_h - h) // 2, w, h)
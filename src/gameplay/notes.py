@@ -0,0 +1,82 @@
+from array import array
+
+# Per-note state bits, packed into NoteStore.flags
+FLAG_CLICKED = 1
+FLAG_MISSED = 2
+FLAG_HOLDING = 4
+FLAG_HOLD_COMPLETE = 8
+FLAG_JUDGED = FLAG_CLICKED | FLAG_MISSED | FLAG_HOLDING | FLAG_HOLD_COMPLETE
+
+
+class NoteStore:
+    """Columnar storage for every note of a chart, kept sorted by time.
+
+    A note costs 42 bytes across the arrays (hit window and lane index
+    included) and none of it is tracked by the garbage collector, so marathon
+    charts don't stretch GC pauses.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def __len__(self):
+        return len(self.times)
+
+    def append(self, lane, time, duration=0):
+        self.times.append(time)
+        self.lanes.append(lane)
+        self.durations.append(duration)
+        self.flags.append(0)
+
+    def clear(self):
+        self.times = array('d')
+        self.lanes = array('b')
+        self.durations = array('d')
+        self.flags = array('B')
+        self.window_start = array('d')
+        self.window_end = array('d')
+        self.lane_notes = [array('l') for _ in range(4)]
+
+    def build_windows(self, max_window):
+        """Precomputes each note's hit window once the chart is complete.
+
+        A note can be hit from window_start to window_end: max_window either side
+        of its time, cut at the midpoint to its neighbours in the same lane so two
+        windows never overlap. lane_notes lists the note indices of every lane.
+        """
+        count = len(self.times)
+        self.window_start = array('d', [0.0]) * count
+        self.window_end = array('d', [0.0]) * count
+        self.lane_notes = [array('l') for _ in range(4)]
+        for i in range(count):
+            self.lane_notes[self.lanes[i]].append(i)
+        times = self.times
+        for indices in self.lane_notes:
+            prev = None
+            for k, i in enumerate(indices):
+                t = times[i]
+                start, end = t - max_window, t + max_window
+                if prev is not None:
+                    start = max(start, (times[prev] + t) / 2)
+                if k + 1 < len(indices):
+                    end = min(end, (t + times[indices[k + 1]]) / 2)
+                self.window_start[i] = start
+                self.window_end[i] = end
+                prev = i
+
+    def reset_flags(self, start=0):
+        self.flags[start:] = array('B', bytes(len(self.flags) - start))
+
+
+def flag_property(bit):
+    """Exposes one bit of NoteStore.flags as a boolean attribute on a note view."""
+    def getter(self):
+        return self.notes.flags[self.index] & bit != 0
+
+    def setter(self, value):
+        if value:
+            self.notes.flags[self.index] |= bit
+        else:
+            self.notes.flags[self.index] &= ~bit
+
+    return property(getter, setter)
@@ -0,0 +1,49 @@
+from itertools import islice
+
+
+class EffectPool:
+    """Fixed-capacity pool of short-lived effect objects.
+
+    Live objects are always items[:count]. Spawning hands out the next free
+    slot and retiring swaps the dead object with the last live one, so both
+    are O(1) and nothing is allocated after construction. When the pool is
+    full, slots are recycled round-robin; retiring reorders items, so that is
+    not necessarily the oldest effect.
+    """
+
+    def __init__(self, factory, capacity):
+        self.items = [factory() for _ in range(capacity)]
+        self.capacity = capacity
+        self.count = 0
+        self._steal = 0
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return islice(self.items, self.count)
+
+    def spawn(self):
+        if self.count < self.capacity:
+            obj = self.items[self.count]
+            self.count += 1
+            return obj
+        obj = self.items[self._steal]
+        self._steal = (self._steal + 1) % self.capacity
+        return obj
+
+    def update(self, dt):
+        items = self.items
+        i = 0
+        while i < self.count:
+            obj = items[i]
+            obj.update(dt)
+            if obj.life <= 0:
+                self.count -= 1
+                items[i] = items[self.count]
+                items[self.count] = obj
+            else:
+                i += 1
+
+    def clear(self):
+        self.count = 0
@@ -0,0 +1,126 @@
+import json
+import math
+import os
+import time
+from array import array
+
+from src.core.constants import JUDGE_WINDOWS
+
+HIST_WINDOW = JUDGE_WINDOWS[-1]  # seconds either side of the note covered by the histogram
+HIST_BINS = 18
+
+class TimingStats:
+    """Signed hit offsets for one play session, in preallocated arrays.
+
+    An offset is the key press time minus the note time in seconds, so early
+    hits are negative. Recording is a couple of array stores; if a practice
+    loop outgrows the buffer the oldest hits are overwritten.
+    """
+
+    def __init__(self, capacity=256):
+        self.capacity = 0
+        self.offsets = array('d')
+        self.lanes = array('b')
+        self.grades = array('b')
+        self.resize(capacity)
+
+    def resize(self, capacity):
+        capacity = max(256, capacity)
+        if capacity != self.capacity:
+            self.capacity = capacity
+            self.offsets = array('d', [0.0]) * capacity
+            self.lanes = array('b', [0]) * capacity
+            self.grades = array('b', [0]) * capacity
+        self.clear()
+
+    def clear(self):
+        self.index = 0
+        self.recorded = 0
+        self.misses = [0, 0, 0, 0]
+        self.ghosts = [0, 0, 0, 0]
+        self.started = time.time()
+        self.dirty = False
+
+    def record(self, lane, offset, grade=0):
+        i = self.index
+        self.offsets[i] = offset
+        self.lanes[i] = lane
+        self.grades[i] = grade
+        self.index = (i + 1) % self.capacity
+        self.recorded += 1
+        self.dirty = True
+
+    def record_miss(self, lane):
+        self.misses[lane] += 1
+        self.dirty = True
+
+    def record_ghost(self, lane):
+        """A key press with no note in reach."""
+        self.ghosts[lane] += 1
+        self.dirty = True
+
+    def _ordered_slots(self):
+        count = min(self.recorded, self.capacity)
+        start = (self.index - count) % self.capacity
+        return [(start + k) % self.capacity for k in range(count)]
+
+    @staticmethod
+    def _stats(values):
+        if not values:
+            return {"count": 0, "mean_ms": None, "stddev_ms": None}
+        mean = sum(values) / len(values)
+        var = sum((v - mean) ** 2 for v in values) / len(values)
+        return {"count": len(values), "mean_ms": round(mean * 1000, 2), "stddev_ms": round(math.sqrt(var) * 1000, 2)}
+
+    def summary(self):
+        slots = self._ordered_slots()
+        offsets = [self.offsets[s] for s in slots]
+        data = self._stats(offsets)
+        data["early"] = sum(1 for v in offsets if v < 0)
+        data["late"] = sum(1 for v in offsets if v > 0)
+        data["misses"] = sum(self.misses)
+        data["ghosts"] = sum(self.ghosts)
+        data["grades"] = [0] * len(JUDGE_WINDOWS)
+        for s in slots:
+            data["grades"][self.grades[s]] += 1
+        data["lanes"] = []
+        for lane in range(4):
+            lane_data = self._stats([self.offsets[s] for s in slots if self.lanes[s] == lane])
+            lane_data["misses"] = self.misses[lane]
+            lane_data["ghosts"] = self.ghosts[lane]
+            data["lanes"].append(lane_data)
+        return data
+
+    def histogram(self, bins=HIST_BINS, window=HIST_WINDOW):
+        """Counts over [-window, window]; hits outside land in the edge bins."""
+        counts = [0] * bins
+        width = 2 * window / bins
+        for s in self._ordered_slots():
+            b = int((self.offsets[s] + window) / width)
+            counts[min(bins - 1, max(0, b))] += 1
+        return counts
+
+    def export(self, meta, directory="assets/sessions"):
+        """Writes the session to <directory>/<start time with ms>_<song>.json and returns the path."""
+        if not self.dirty: return None
+        os.makedirs(directory, exist_ok=True)
+        stem = os.path.splitext(os.path.basename(meta.get("song", "session")))[0]
+        # Milliseconds keep a retry and exit within the same second from overwriting each other
+        stamp = f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(self.started))}-{int(self.started * 1000) % 1000:03d}"
+        path = os.path.join(directory, f"{stamp}_{stem}.json")
+        n = 1
+        while os.path.exists(path):
+            path = os.path.join(directory, f"{stamp}_{stem}-{n}.json")
+            n += 1
+        slots = self._ordered_slots()
+        data = {
+            "meta": dict(meta, started=self.started, ended=time.time()),
+            "summary": self.summary(),
+            "histogram": {"window_ms": HIST_WINDOW * 1000, "bins": self.histogram()},
+            "hits": [[self.lanes[s], round(self.offsets[s] * 1000, 2), self.grades[s]] for s in slots],
+        }
+        with open(path, "w") as f:
+            json.dump(data, f)
+        self.dirty = False
+        print(f"Timing report written to {path} ({len(slots)} hits)")
+        return path
@@ -1,15 +1,19 @@
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
-                             QLabel, QPushButton, QListWidget, QListWidgetItem, 
+                             QLabel, QPushButton, QListView, QLineEdit,
                              QGraphicsDropShadowEffect, QHBoxLayout, QComboBox,
-                             QProgressBar, QFrame, QScrollArea, QSlider)
-from PyQt5.QtCore import Qt, QSize, pyqtSignal, QThread, pyqtSlot
-from PyQt5.QtGui import QFont, QColor, QFontMetrics, QPixmap
+                             QProgressBar, QFrame, QSlider)
+from PyQt5.QtCore import Qt, QSize, pyqtSignal, QThread, pyqtSlot, QEventLoop, QTimer
+from PyQt5.QtGui import QFont, QColor, QFontMetrics, QPixmap, QImage
 import os
 import sys
+from src.ui.song_list import SongListModel, SongFilterProxy, SongCardDelegate, SongRole, SORT_KEYS
+from src.ui.thumbnails import ThumbnailStore, save_thumbnail
+from src.ui.preview import PreviewPlayer, HOVER_DELAY
 
 class AnalysisThread(QThread):
     progress = pyqtSignal(int, str)
-    finished = pyqtSignal(list)
+    finished = pyqtSignal(list, list)
+    thumbnail = pyqtSignal(str, QImage)
 
     def __init__(self, song_path, difficulty):
         super().__init__()
@@ -18,70 +22,53 @@ class AnalysisThread(QThread):
 
     def run(self):
         from src.core.beat_detector import BeatDetector
-        detector = BeatDetector(self.song_path)
-        beats = detector.analyze(self.difficulty, self.report_progress)
-        self.finished.emit(beats)
+        from src.core.library import SongLibrary
+        library = SongLibrary()
+        name = os.path.basename(self.song_path)
+        detector = BeatDetector(self.song_path, fingerprint=library.fingerprint_of(name))
+        beats = detector.analyze(self.difficulty, self.report_progress, self.save_thumbnail)
+        # tempo stays None when analysis failed and beats is just the fallback grid
+        if detector.tempo is not None:
+            library.record_analysis(name, self.difficulty, detector.tempo, detector.beat_count)
+        self.finished.emit(beats, detector.beat_bands or [])
 
     def report_progress(self, val, msg):
         self.progress.emit(val, msg)
 
-class SongCard(QFrame):
-    clicked = pyqtSignal(str)
-    
-    def __init__(self, song_name, parent=None):
-        super().__init__(parent)
-        self.song_name = song_name
-        self.init_ui()
+    def save_thumbnail(self, y, sr):
+        try:
+            self.thumbnail.emit(os.path.basename(self.song_path), save_thumbnail(self.song_path, y))
+        except Exception as e:
+            print(f"Thumbnail from analysis failed: {e}")
 
-    def init_ui(self):
-        self.setFixedSize(280, 80)
-        self.setCursor(Qt.PointingHandCursor)
-        self.setObjectName("SongCard")
-        self.setStyleSheet("""
-            #SongCard {
-                background-color: #252525;
-                border-radius: 12px;
-                border: 2px solid transparent;
-            }
-            #SongCard:hover {
-                background-color: #2D2D2D;
-                border: 2px solid #00B8D4;
-            }
-        """)
-        
-        layout = QHBoxLayout(self)
-        
-        # Icon/Thumbnail placeholder
-        self.icon = QLabel("🎵")
-        self.icon.setStyleSheet("font-size: 24px; padding-left: 10px;")
-        layout.addWidget(self.icon)
-        
-        # Textinfo
-        info_layout = QVBoxLayout()
-        metrics = QFontMetrics(QFont("Arial", 11, QFont.Bold))
-        elided = metrics.elidedText(self.song_name, Qt.ElideRight, 180)
-        
-        self.title = QLabel(elided)
-        self.title.setStyleSheet("color: white; font-weight: bold; font-size: 14px;")
-        
-        self.sub = QLabel("Local MP3 File")
-        self.sub.setStyleSheet("color: #777; font-size: 11px;")
-        
-        info_layout.addWidget(self.title)
-        info_layout.addWidget(self.sub)
-        layout.addLayout(info_layout)
-        layout.addStretch()
+class LibraryScanThread(QThread):
+    """Runs SongLibrary.scan() (stat, fingerprint and duration of new files) off the UI thread."""
+    scanned = pyqtSignal(list)
+
+    def __init__(self, library):
+        super().__init__()
+        self.library = library
 
-    def mousePressEvent(self, event):
-        self.clicked.emit(self.song_name)
+    def run(self):
+        try:
+            self.scanned.emit(self.library.scan())
+        except Exception as e:
+            print(f"Library scan failed: {e}")
 
 class MenuQt(QMainWindow):
-    song_ready = pyqtSignal(str, str, list, dict) # name, diff, beats, custom_settings
+    song_ready = pyqtSignal(str, str, list, list, dict, float) # name, diff, beats, beat_bands, custom_settings, indexed duration (0 if unknown)
+    closed = pyqtSignal()
+    first_paint = pyqtSignal()
 
-    def __init__(self, songs):
+    def __init__(self, songs, library=None):
         super().__init__()
+        self.painted = False
         self.songs = songs
-        self.selected_song = songs[0] if songs else None
+        self.library = library
+        self.scan_thread = None
+        self.thumbnails = ThumbnailStore(parent=self)
+        self.preview = PreviewPlayer.from_env()
+        self.selected_song = songs[0]["name"] if songs else None
         self.init_ui()
 
     def init_ui(self):
@@ -176,6 +163,22 @@ class MenuQt(QMainWindow):
         hold_l.addWidget(self.hold_slider)
         left_layout.addWidget(hold_box)
 
+        # Render Scale Slider
+        scale_box = QWidget()
+        scale_l = QVBoxLayout(scale_box)
+        scale_l.setContentsMargins(0,0,0,0)
+        self.scale_label = QLabel("Render Scale: 100%")
+        self.scale_label.setStyleSheet("color: #AAA; font-size: 11px;")
+        self.scale_slider = QSlider(Qt.Horizontal)
+        self.scale_slider.setRange(50, 100)
+        self.scale_slider.setSingleStep(5)
+        self.scale_slider.setPageStep(25)
+        self.scale_slider.setValue(100)
+        self.scale_slider.valueChanged.connect(self.on_scale_changed)
+        scale_l.addWidget(self.scale_label)
+        scale_l.addWidget(self.scale_slider)
+        left_layout.addWidget(scale_box)
+
         left_layout.addStretch()
 
         # Connect diff combo AFTER sliders are created
@@ -216,29 +219,88 @@ class MenuQt(QMainWindow):
         header.setStyleSheet("color: white; font-size: 18px; font-weight: bold;")
         right_layout.addWidget(header)
         
-        # Scroll Area
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        scroll.setStyleSheet("QScrollArea { border: none; background: transparent; } QScrollBar:vertical { width: 4px; background: transparent; } QScrollBar::handle:vertical { background: #333; border-radius: 2px; }")
-        
-        scroll_content = QWidget()
-        self.grid_layout = QVBoxLayout(scroll_content)
-        self.grid_layout.setSpacing(12)
-        
-        for song in self.songs:
-            card = SongCard(song)
-            card.clicked.connect(self.select_song)
-            self.grid_layout.addWidget(card)
-        
-        self.grid_layout.addStretch()
-        scroll.setWidget(scroll_content)
-        right_layout.addWidget(scroll)
+        # Search + sort
+        filter_row = QHBoxLayout()
+        self.search_box = QLineEdit()
+        self.search_box.setPlaceholderText("Search songs...")
+        self.search_box.setFixedHeight(34)
+        self.search_box.setStyleSheet("QLineEdit { background-color: #252525; color: white; border-radius: 6px; padding-left: 10px; border: 1px solid #333; }")
+        self.sort_combo = QComboBox()
+        self.sort_combo.addItems(list(SORT_KEYS))
+        self.sort_combo.setFixedHeight(34)
+        self.sort_combo.setStyleSheet("""
+            QComboBox { background-color: #252525; color: white; border-radius: 6px; padding-left: 10px; border: 1px solid #333; }
+            QComboBox QAbstractItemView { background-color: #252525; color: white; selection-background-color: #00B8D4; }
+        """)
+        filter_row.addWidget(self.search_box)
+        filter_row.addWidget(self.sort_combo)
+        right_layout.addLayout(filter_row)
+
+        # Song list: a model + delegate, so only visible rows are painted
+        self.song_model = SongListModel(self.songs, self)
+        self.song_proxy = SongFilterProxy(self)
+        self.song_proxy.setSourceModel(self.song_model)
+        self.song_view = QListView()
+        self.song_view.setModel(self.song_proxy)
+        self.song_view.setItemDelegate(SongCardDelegate(self.song_view, self.thumbnails))
+        self.thumbnails.updated.connect(self.song_view.viewport().update)
+        self.song_view.setUniformItemSizes(True)
+        self.song_view.setMouseTracking(True)
+        self.song_view.setCursor(Qt.PointingHandCursor)
+        self.song_view.setVerticalScrollMode(QListView.ScrollPerPixel)
+        self.song_view.setStyleSheet("QListView { border: none; background: transparent; outline: none; } QScrollBar:vertical { width: 4px; background: transparent; } QScrollBar::handle:vertical { background: #333; border-radius: 2px; }")
+        self.song_view.clicked.connect(self.on_song_clicked)
+        # Keyboard navigation moves the current row without a click
+        self.song_view.selectionModel().currentChanged.connect(self.on_current_song_changed)
+        self.song_view.entered.connect(self.on_song_hovered)
+        self.search_box.textChanged.connect(self.song_proxy.setFilterFixedString)
+        self.sort_combo.currentTextChanged.connect(self.song_model.set_sort_key)
+        right_layout.addWidget(self.song_view)
 
         main_layout.addWidget(self.right_panel)
         
         if self.selected_song:
             self.select_song(self.selected_song)
 
+    def set_songs(self, songs):
+        if songs == self.songs: return
+        self.songs = songs
+        self.song_model.set_songs(songs)
+        if self.selected_song not in [song["name"] for song in songs]:
+            self.selected_song = songs[0]["name"] if songs else None
+            if self.selected_song:
+                self.select_song(self.selected_song)
+
+    def rescan(self):
+        """Refreshes the list from a background library scan; the index shown meanwhile may be stale."""
+        if self.library is None or (self.scan_thread and self.scan_thread.isRunning()):
+            return
+        self.scan_thread = LibraryScanThread(self.library)
+        self.scan_thread.scanned.connect(self.set_songs)
+        self.scan_thread.start(QThread.LowPriority)
+
+    def reset_controls(self):
+        self.start_btn.setEnabled(True)
+        self.diff_combo.setEnabled(True)
+        self.prog_bar.setValue(0)
+        self.prog_label.setText("Ready to play")
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.painted:
+            self.painted = True
+            self.first_paint.emit()
+            # The scan only starts once the dashboard is on screen
+            QTimer.singleShot(0, self.rescan)
+
+    def closeEvent(self, event):
+        self.preview.stop()
+        self.thumbnails.shutdown()
+        if self.scan_thread:
+            self.scan_thread.wait()
+        self.closed.emit()
+        super().closeEvent(event)
+
     def on_speed_changed(self, v):
         self.speed_label.setText(f"Scroll Speed: {v}")
 
@@ -248,6 +310,9 @@ class MenuQt(QMainWindow):
     def on_hold_changed(self, v):
         self.hold_label.setText(f"Hold Probability: {v}%")
 
+    def on_scale_changed(self, v):
+        self.scale_label.setText(f"Render Scale: {v}%")
+
     def sync_sliders_to_preset(self):
         diff = self.diff_combo.currentText()
         presets = {
@@ -265,12 +330,29 @@ class MenuQt(QMainWindow):
             self.chord_slider.setValue(p["chord"])
             self.hold_slider.setValue(p["hold"])
 
+    def on_song_clicked(self, index):
+        self.select_song(index.data())
+        self.play_preview(index.data(SongRole), 0.0)
+
+    def on_current_song_changed(self, current, previous):
+        if current.isValid():
+            self.select_song(current.data())
+
+    def on_song_hovered(self, index):
+        self.play_preview(index.data(SongRole), HOVER_DELAY)
+
+    def play_preview(self, song, delay):
+        if not song: return
+        start = (song["duration"] or 0.0) * 0.35
+        self.preview.play(os.path.join("assets/music", song["name"]), start, delay)
+
     def select_song(self, song_name):
         self.selected_song = song_name
         metrics = QFontMetrics(QFont("Segoe UI", 24, QFont.Bold))
         self.song_display.setText(metrics.elidedText(song_name, Qt.ElideRight, 320))
 
     def on_start_clicked(self):
+        self.preview.stop()
         self.start_btn.setEnabled(False)
         self.diff_combo.setEnabled(False)
         self.prog_label.setText("Preparing...")
@@ -279,6 +361,7 @@ class MenuQt(QMainWindow):
         self.thread = AnalysisThread(song_path, self.diff_combo.currentText())
         self.thread.progress.connect(self.update_progress)
         self.thread.finished.connect(self.on_analysis_finished)
+        self.thread.thumbnail.connect(self.thumbnails.put_image)
         self.thread.start()
 
     @pyqtSlot(int, str)
@@ -286,31 +369,62 @@ class MenuQt(QMainWindow):
         self.prog_bar.setValue(val)
         self.prog_label.setText(msg.upper())
 
-    def on_analysis_finished(self, beats):
+    def on_analysis_finished(self, beats, bands=None):
         custom = {
             "speed": self.speed_slider.value(),
             "chord_chance": self.chord_slider.value() / 100.0 if self.chord_slider.value() > 0 else None,
-            "hold_chance": self.hold_slider.value() / 100.0
+            "hold_chance": self.hold_slider.value() / 100.0,
+            "render_scale": self.scale_slider.value() / 100.0
         }
-        self.song_ready.emit(self.selected_song, self.diff_combo.currentText(), beats, custom)
-        self.close()
-
-def run_menu(songs):
-    app = QApplication.instance()
-    if not app:
-        app = QApplication(sys.argv)
-    
-    window = MenuQt(songs)
-    window.show()
-    
-    result = {"song": None, "diff": "Normal", "beats": [], "custom": {}}
-    def handle_ready(song, diff, beats, custom):
-        result["song"] = song
-        result["diff"] = diff
-        result["beats"] = beats
-        result["custom"] = custom
-        window.close()
-    
-    window.song_ready.connect(handle_ready)
-    app.exec_()
-    return result["song"], result["diff"], result["beats"], result["custom"]
+        # The game takes over pygame's music stream from here
+        self.preview.stop(wait=True)
+        song = next((s for s in self.songs if s["name"] == self.selected_song), None)
+        duration = float(song["duration"] or 0.0) if song else 0.0
+        self.song_ready.emit(self.selected_song, self.diff_combo.currentText(), beats, bands or [], custom, duration)
+        self.hide()
+
+class MenuLauncher:
+    """Owns the QApplication and a single MenuQt that is shown and hidden between songs."""
+
+    def __init__(self, library=None):
+        self.library = library
+        self.app = QApplication.instance()
+        if not self.app:
+            self.app = QApplication(sys.argv)
+        self.app.setQuitOnLastWindowClosed(False)
+        self.window = None
+
+    def run(self, songs, on_shown=None, on_first_paint=None):
+        if self.window is None:
+            self.window = MenuQt(songs, self.library)
+            if on_first_paint:
+                self.window.first_paint.connect(on_first_paint)
+        else:
+            self.window.set_songs(songs)
+            self.window.reset_controls()
+
+        result = {"song": None, "diff": "Normal", "beats": [], "bands": [], "custom": {}, "duration": 0.0}
+        loop = QEventLoop()
+        def handle_ready(song, diff, beats, bands, custom, duration):
+            result["song"] = song
+            result["diff"] = diff
+            result["beats"] = beats
+            result["bands"] = bands
+            result["custom"] = custom
+            result["duration"] = duration
+            loop.quit()
+
+        self.window.song_ready.connect(handle_ready)
+        self.window.closed.connect(loop.quit)
+        self.window.show()
+        self.window.raise_()
+        self.window.activateWindow()
+        if on_shown:
+            on_shown()
+        if self.window.painted:
+            self.window.rescan()
+        loop.exec_()
+        self.window.song_ready.disconnect(handle_ready)
+        self.window.closed.disconnect(loop.quit)
+        self.window.hide()
+        return result["song"], result["diff"], result["beats"], result["bands"], result["custom"], result["duration"]
@@ -0,0 +1,112 @@
+import os
+import threading
+
+PREVIEW_SECONDS = 8.0
+HOVER_DELAY = 0.35  # seconds the pointer has to rest on a row before it plays
+FADE_IN_MS = 150
+FADE_OUT_MS = 400
+
+class PreviewPlayer:
+    """Plays a short clip of the hovered or selected song on pygame's music stream.
+
+    Loading and starting happen on a daemon thread so the dashboard never waits
+    on pygame's import or the decoder. Only the newest request counts: moving
+    the pointer before HOVER_DELAY runs out cancels the previous one.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.cond = threading.Condition()
+        self.request = None
+        self.generation = 0
+        self.idle = threading.Event()
+        self.idle.set()
+        self.thread = None
+        self.mixer = None
+
+    @classmethod
+    def from_env(cls):
+        return cls(enabled=os.environ.get("TILES_PREVIEW", "1") != "0")
+
+    def play(self, song_path, start=0.0, delay=0.0):
+        self._submit((song_path, start, delay))
+
+    def stop(self, wait=False):
+        """Stops any preview; with wait=True, returns only once the worker has let go of the music stream.
+
+        There is no timeout: the first preview pays pygame's import and mixer
+        init, and handing the stream to the game before that finishes would let
+        the preview load over the game's song.
+        """
+        if self.thread is None:
+            return
+        self._submit(None)
+        if wait:
+            self.idle.wait()
+
+    def _submit(self, request):
+        if not self.enabled:
+            return
+        with self.cond:
+            self.request = request
+            self.generation += 1
+            self.idle.clear()
+            self.cond.notify()
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, name="preview", daemon=True)
+            self.thread.start()
+
+    def _wait_for_newer(self, generation, timeout):
+        """Waits up to timeout seconds; True if another request came in meanwhile."""
+        with self.cond:
+            self.cond.wait_for(lambda: self.generation != generation, timeout)
+            return self.generation != generation
+
+    def _current(self, generation):
+        with self.cond:
+            return self.generation == generation
+
+    def _mark_idle(self, generation):
+        with self.cond:
+            if self.generation == generation:
+                self.idle.set()
+
+    def run(self):
+        seen = 0
+        while True:
+            with self.cond:
+                self.cond.wait_for(lambda: self.generation != seen)
+                request, seen = self.request, self.generation
+            if request is None:
+                if self.mixer:
+                    self.mixer.music.stop()
+                self._mark_idle(seen)
+                continue
+            song_path, start, delay = request
+            if delay and self._wait_for_newer(seen, delay):
+                continue
+            try:
+                mixer = self._mixer()
+                # Either step can take a while; drop the request as soon as a newer one (or a stop) is in
+                if not self._current(seen):
+                    continue
+                mixer.music.load(song_path)
+                if not self._current(seen):
+                    continue
+                mixer.music.play(start=start, fade_ms=FADE_IN_MS)
+            except Exception as e:
+                print(f"Preview failed for {os.path.basename(song_path)}: {e}")
+            if not self._wait_for_newer(seen, PREVIEW_SECONDS):
+                if self.mixer:
+                    self.mixer.music.fadeout(FADE_OUT_MS)
+                self._mark_idle(seen)
+
+    def _mixer(self):
+        if self.mixer is None:
+            import pygame
+            from src.core.constants import AUDIO_BUFFER
+            # Same settings GameWindow asks for, so the game reuses this mixer as is
+            pygame.mixer.pre_init(buffer=AUDIO_BUFFER)
+            pygame.mixer.init()
+            self.mixer = pygame.mixer
+        return self.mixer
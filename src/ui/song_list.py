@@ -0,0 +1,119 @@
+from PyQt5.QtWidgets import QStyledItemDelegate, QStyle
+from PyQt5.QtCore import Qt, QSize, QRectF, QAbstractListModel, QModelIndex, QSortFilterProxyModel
+from PyQt5.QtGui import QFont, QColor, QFontMetrics, QPen
+
+SongRole = Qt.UserRole
+
+# Sort keys for the library, longest / fastest first for the numeric ones
+SORT_KEYS = {
+    "Title": (lambda song: song["name"].lower(), False),
+    "Duration": (lambda song: song["duration"] or 0.0, True),
+    "BPM": (lambda song: song["tempo"] or 0.0, True),
+}
+
+CARD_WIDTH = 280
+CARD_HEIGHT = 80
+CARD_SPACING = 12
+
+def describe_song(song):
+    """Subtitle for a library row, e.g. '3:42  •  128 BPM'."""
+    parts = []
+    if song.get("duration"):
+        minutes, seconds = divmod(int(song["duration"]), 60)
+        parts.append(f"{minutes}:{seconds:02}")
+    if song.get("tempo"):
+        parts.append(f"{song['tempo']:.0f} BPM")
+    return "  •  ".join(parts) if parts else "Local MP3 File"
+
+class SongListModel(QAbstractListModel):
+    """Library rows straight from SongLibrary.scan(); no widget per song."""
+
+    def __init__(self, songs=None, parent=None):
+        super().__init__(parent)
+        self.sort_key = "Title"
+        self.songs = self._sorted(songs or [])
+
+    def _sorted(self, songs):
+        key, reverse = SORT_KEYS[self.sort_key]
+        return sorted(songs, key=key, reverse=reverse)
+
+    def set_songs(self, songs):
+        self.beginResetModel()
+        self.songs = self._sorted(songs)
+        self.endResetModel()
+
+    def set_sort_key(self, sort_key):
+        """Sorts in Python in one pass instead of letting a proxy call data() per comparison."""
+        if sort_key not in SORT_KEYS: return
+        self.sort_key = sort_key
+        self.set_songs(self.songs)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.songs)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        song = self.songs[index.row()]
+        if role == Qt.DisplayRole:
+            return song["name"]
+        if role == SongRole:
+            return song
+        return None
+
+class SongFilterProxy(QSortFilterProxyModel):
+    """Case-insensitive incremental title search over SongListModel."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setFilterCaseSensitivity(Qt.CaseInsensitive)
+
+class SongCardDelegate(QStyledItemDelegate):
+    """Paints the song card look for the visible rows only."""
+
+    def __init__(self, parent=None, thumbnails=None):
+        super().__init__(parent)
+        self.thumbnails = thumbnails
+        self.title_font = QFont("Segoe UI", 11, QFont.Bold)
+        self.title_metrics = QFontMetrics(self.title_font)
+        self.sub_font = QFont("Segoe UI", 8)
+        self.icon_font = QFont("Segoe UI Emoji", 18)
+        self.card_color = QColor("#252525")
+        self.hover_color = QColor("#2D2D2D")
+        self.accent_pen = QPen(QColor("#00B8D4"), 2)
+        self.title_color = QColor("white")
+        self.sub_color = QColor("#777")
+
+    def sizeHint(self, option, index):
+        return QSize(CARD_WIDTH, CARD_HEIGHT + CARD_SPACING)
+
+    def paint(self, painter, option, index):
+        song = index.data(SongRole)
+        if song is None:
+            return
+        painter.save()
+        painter.setRenderHint(painter.Antialiasing)
+        rect = QRectF(option.rect.x() + 1, option.rect.y() + 1, CARD_WIDTH - 2, CARD_HEIGHT - 2)
+        hovered = option.state & QStyle.State_MouseOver
+        selected = option.state & QStyle.State_Selected
+        painter.setPen(self.accent_pen if hovered or selected else Qt.NoPen)
+        painter.setBrush(self.hover_color if hovered else self.card_color)
+        painter.drawRoundedRect(rect, 12, 12)
+
+        painter.setFont(self.icon_font)
+        painter.setPen(self.title_color)
+        painter.drawText(QRectF(rect.x() + 16, rect.y(), 40, rect.height()), Qt.AlignVCenter, "🎵")
+
+        text_x = rect.x() + 64
+        painter.setFont(self.title_font)
+        title = self.title_metrics.elidedText(song["name"], Qt.ElideRight, 180)
+        painter.drawText(QRectF(text_x, rect.y() + 8, 190, 24), Qt.AlignLeft | Qt.AlignVCenter, title)
+        painter.setFont(self.sub_font)
+        painter.setPen(self.sub_color)
+        painter.drawText(QRectF(text_x, rect.y() + 32, 190, 20), Qt.AlignLeft | Qt.AlignVCenter, describe_song(song))
+        if self.thumbnails is not None:
+            # Built in the background on first paint; the row repaints when it lands
+            waveform = self.thumbnails.get(song["name"])
+            if waveform:
+                painter.drawPixmap(int(text_x), int(rect.y() + 56), waveform)
+        painter.restore()
@@ -0,0 +1,199 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from PyQt5.QtCore import QThread, QObject, QTimer, pyqtSignal
+from PyQt5.QtGui import QImage, QColor, QPixmap
+
+WAVEFORM_WIDTH = 196
+WAVEFORM_HEIGHT = 14
+WAVEFORM_COLOR = QColor(0, 184, 212, 150)
+THUMBNAIL_SR = 4000  # fallback decode rate when a file can't be streamed
+
+def thumbnail_key(song_path):
+    """Cache key that changes when the file does."""
+    st = os.stat(song_path)
+    return hashlib.md5(f"{os.path.basename(song_path)}:{st.st_size}:{int(st.st_mtime)}".encode()).hexdigest()
+
+def waveform_peaks(y, points=WAVEFORM_WIDTH // 2):
+    """Per-column peak level in [0, 1] for a mono or (frames, channels) signal."""
+    import numpy as np
+    y = np.asarray(y, dtype=np.float32)
+    if y.ndim > 1:
+        y = np.abs(y).max(axis=1)
+    else:
+        y = np.abs(y)
+    peaks = np.zeros(points, dtype=np.float32)
+    if len(y):
+        add_peaks(peaks, y, 0, len(y))
+    top = peaks.max()
+    return peaks / top if top > 0 else peaks
+
+def add_peaks(peaks, level, pos, frames):
+    """Folds a run of levels starting at frame pos into the running per-column maxima."""
+    import numpy as np
+    points = len(peaks)
+    columns = np.minimum(np.arange(pos, pos + len(level)) * points // frames, points - 1)
+    # Columns only ever increase, so each run of equal ones reduces to a single max
+    starts = np.flatnonzero(np.r_[True, columns[1:] != columns[:-1]])
+    hit = columns[starts]
+    peaks[hit] = np.maximum(peaks[hit], np.maximum.reduceat(level, starts))
+
+def stream_peaks(song_path, points=WAVEFORM_WIDTH // 2, blocksize=65536):
+    """waveform_peaks for a file, read block by block so memory stays at one block whatever the length."""
+    import numpy as np
+    import soundfile
+    peaks = np.zeros(points, dtype=np.float32)
+    with soundfile.SoundFile(song_path) as f:
+        frames = f.frames
+        if frames <= 0:
+            raise ValueError("unknown length")
+        pos = 0
+        for block in f.blocks(blocksize, dtype="float32", always_2d=True):
+            add_peaks(peaks, np.abs(block).max(axis=1), pos, frames)
+            pos += len(block)
+    top = peaks.max()
+    return peaks / top if top > 0 else peaks
+
+def render_waveform(peaks, width=WAVEFORM_WIDTH, height=WAVEFORM_HEIGHT):
+    """Mirrored bar waveform on a transparent QImage, filled with NumPy in one pass.
+
+    Safe outside the GUI thread, and a handful of array ops instead of a QPainter
+    call per bar keeps the worker from holding the GIL against the UI.
+    """
+    import numpy as np
+    columns = np.arange(width)
+    bar_w = width / len(peaks)
+    bar = np.minimum((columns / bar_w).astype(np.intp), len(peaks) - 1)
+    gap = (columns - bar * bar_w) >= max(1.0, bar_w - 1)
+    half = np.maximum(0.5, np.asarray(peaks, dtype=np.float32)[bar] * height / 2)
+    rows = np.abs(np.arange(height) + 0.5 - height / 2)[:, None]
+    mask = (rows <= half[None, :]) & ~gap[None, :]
+    # Premultiplied ARGB32, one uint32 per pixel
+    c = WAVEFORM_COLOR
+    a = c.alpha()
+    pixel = (a << 24) | ((c.red() * a // 255) << 16) | ((c.green() * a // 255) << 8) | (c.blue() * a // 255)
+    data = np.where(mask, np.uint32(pixel), np.uint32(0)).astype(np.uint32)
+    return QImage(data.tobytes(), width, height, width * 4, QImage.Format_ARGB32_Premultiplied).copy()
+
+def save_thumbnail(song_path, y, cache_dir="assets/cache/thumbs"):
+    """Writes the thumbnail from an already decoded signal, e.g. the one beat analysis just loaded."""
+    return save_peaks(song_path, waveform_peaks(y), cache_dir)
+
+def save_peaks(song_path, peaks, cache_dir="assets/cache/thumbs"):
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, thumbnail_key(song_path) + ".png")
+    image = render_waveform(peaks)
+    image.save(path)
+    return image
+
+class ThumbnailWorker(QThread):
+    """Loads or builds thumbnails for the rows that asked for one, newest request first."""
+    ready = pyqtSignal(str, QImage)
+
+    def __init__(self, music_dir="assets/music", cache_dir="assets/cache/thumbs", max_pending=64):
+        super().__init__()
+        self.music_dir = music_dir
+        self.cache_dir = cache_dir
+        self.max_pending = max_pending
+        self.pending = []
+        self.cond = threading.Condition()
+        self.stopping = False
+
+    def request(self, name):
+        with self.cond:
+            if name in self.pending:
+                self.pending.remove(name)
+            self.pending.append(name)
+            # Rows scrolled past long ago can wait until they are painted again
+            dropped = self.pending[:-self.max_pending]
+            del self.pending[:-self.max_pending]
+            self.cond.notify()
+        return dropped
+
+    def stop(self):
+        with self.cond:
+            self.stopping = True
+            self.cond.notify()
+        self.wait(2000)
+
+    def run(self):
+        while True:
+            with self.cond:
+                while not self.pending and not self.stopping:
+                    self.cond.wait()
+                if self.stopping:
+                    return
+                name = self.pending.pop()
+            self.ready.emit(name, self.build(name))
+
+    def build(self, name):
+        song_path = os.path.join(self.music_dir, name)
+        try:
+            path = os.path.join(self.cache_dir, thumbnail_key(song_path) + ".png")
+            if os.path.exists(path):
+                image = QImage(path)
+                if not image.isNull():
+                    return image
+            return save_peaks(song_path, self.peaks(song_path), self.cache_dir)
+        except Exception as e:
+            print(f"Thumbnail failed for {name}: {e}")
+            return QImage()
+
+    @staticmethod
+    def peaks(song_path):
+        try:
+            return stream_peaks(song_path)
+        except Exception:
+            # Formats libsndfile can't stream: a low-rate mono decode is plenty for 98 columns
+            import librosa
+            y, _ = librosa.load(song_path, sr=THUMBNAIL_SR, mono=True, res_type="soxr_qq")
+            return waveform_peaks(y)
+
+class ThumbnailStore(QObject):
+    """UI-side pixmap cache for the song delegate; asks the worker for anything missing."""
+    updated = pyqtSignal()
+
+    def __init__(self, worker=None, capacity=512, parent=None):
+        super().__init__(parent)
+        self.worker = worker or ThumbnailWorker()
+        self.capacity = capacity
+        self.pixmaps = OrderedDict()
+        self.requested = set()
+        self.worker.ready.connect(self.on_ready)
+        # One repaint for a burst of finished thumbnails instead of one each
+        self.update_timer = QTimer(self)
+        self.update_timer.setSingleShot(True)
+        self.update_timer.setInterval(50)
+        self.update_timer.timeout.connect(self.updated)
+
+    def get(self, name):
+        """Pixmap for the song, False if it has none, or None while it is being built."""
+        pixmap = self.pixmaps.get(name)
+        if pixmap is not None:
+            self.pixmaps.move_to_end(name)
+            return pixmap
+        if name not in self.requested:
+            self.requested.add(name)
+            if not self.worker.isRunning():
+                self.worker.start(QThread.LowPriority)
+            for dropped in self.worker.request(name):
+                self.requested.discard(dropped)
+        return None
+
+    def put_image(self, name, image):
+        self.on_ready(name, image)
+
+    def on_ready(self, name, image):
+        self.requested.discard(name)
+        self.pixmaps[name] = False if image.isNull() else QPixmap.fromImage(image)
+        self.pixmaps.move_to_end(name)
+        while len(self.pixmaps) > self.capacity:
+            self.pixmaps.popitem(last=False)
+        if not self.update_timer.isActive():
+            self.update_timer.start()
+
+    def shutdown(self):
+        if self.worker.isRunning():
+            self.worker.stop()
@@ -0,0 +1,49 @@
+import os
+import random
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from src.gameplay.engine import GameEngine, band_peaks
+from src.gameplay.layout import Layout
+
+PEAK_BEATS = {10, 25, 40}
+
+def peaky_bands(count=60):
+    """Every band steady around 0.7 with small wobble; low and high spike together on PEAK_BEATS."""
+    rng = random.Random(1)
+    bands = []
+    for i in range(count):
+        strengths = [0.7 + rng.uniform(-0.05, 0.05) for _ in range(3)]
+        if i in PEAK_BEATS:
+            strengths[0] = strengths[2] = 1.0
+        bands.append(strengths)
+    return bands
+
+def chart(bands, chord_chance):
+    layout = Layout()
+    engine = GameEngine(pygame.Surface((layout.width, layout.height)), "", "Hard",
+                        {"chord_chance": chord_chance, "hold_chance": 0}, 600, layout)
+    engine.set_beats([0.5 * i for i in range(1, len(bands) + 1)], bands)
+    per_beat = {}
+    for t in engine.notes.times:
+        per_beat[t] = per_beat.get(t, 0) + 1
+    return {round(t / 0.5) - 1 for t, n in per_beat.items() if n > 1}
+
+def test_band_peaks_only_flags_beats_that_stand_out():
+    peaks = band_peaks(peaky_bands())
+    assert {i for i, p in enumerate(peaks) if len(p) >= 2} == PEAK_BEATS
+    assert all(peaks[i] == [0, 2] for i in PEAK_BEATS)
+
+def test_chords_follow_band_peaks():
+    random.seed(0)
+    assert chart(peaky_bands(), 1.0) == PEAK_BEATS
+
+def test_flat_bands_place_no_chords():
+    random.seed(0)
+    assert chart([[0.9, 0.9, 0.9]] * 60, 1.0) == set()
+
+def test_chord_chance_is_not_scaled():
+    random.seed(0)
+    assert chart(peaky_bands(), 0.0) == set()